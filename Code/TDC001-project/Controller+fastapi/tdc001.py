@@ -17,6 +17,12 @@ Highlights
 * **Helpful discovery** – :func:`find_tdc001_ports` searches all serial ports
   for likely TDC001 cubes so host scripts can decide which port to mount into
   the container.
+* **asyncio friendly** – :class:`AsyncTDCController` offers the same moves as
+  awaitables, so one event loop can drive many cubes without extra threads.
+* **Observable** – assign an :class:`Instrumentation` subclass to
+  ``TDCController.instrumentation`` to receive serial round‑trip, wait and
+  per‑phase move timings plus device errors (the server's ``/metrics`` does
+  this); :class:`TimingCollector` keeps percentiles in memory.
 
 Run as a script
 ~~~~~~~~~~~~~~~
@@ -27,26 +33,196 @@ without writing any code – perfect for quick bench tests.
 from __future__ import annotations                 # → allow future‑style type hints on Py<3.10
 
 # ────────────────────────────── standard library ──────────────────────────────
+import asyncio                                       # → awaitable twin of the controller
 import inspect                                       # → runtime reflection utilities
+import logging                                       # → report misbehaving listeners
+import os                                            # → read TDC_SIMULATE
+import threading                                     # → Condition to wake waiting threads
 import time                                          # → sleep / simple timing
-from typing import Dict, List                        # → static typing helpers
+from collections import deque                        # → bounded sample windows
+from typing import Callable, Deque, Dict, List, Optional, Tuple  # → static typing helpers
 
 # ────────────────────────────── third‑party libs ──────────────────────────────
 from serial.tools import list_ports                  # → enumerate system serial ports
 from serial.tools.list_ports_common import ListPortInfo  # → rich object describing a port
 from thorlabs_apt_device import TDC001               # → official low‑level driver
 
-__all__ = ["TDCController", "find_tdc001_ports"]     # → what `from … import *` should export
+__all__ = [                                          # → what `from … import *` should export
+    "TDCController", "AsyncTDCController", "Instrumentation", "TimingCollector", "Tee", "MoveSuperseded",
+    "find_tdc001_ports", "find_tdc001_devices",
+]
+
+log = logging.getLogger(__name__)
+
+# messages the cube sends when a move / stop / homing run has finished
+_COMPLETION_MSGS = ("mot_move_completed", "mot_move_stopped", "mot_move_homed")
+
+# first two bytes (message id 0x0490, little endian) of the polled status request
+_STATUS_REQUEST = b"\x90\x04"
+
+# the cube takes speeds in APT units: counts/s × T × 65536 and counts/s² × T² × 65536,
+# T = 2048 / 6 MHz being its servo cycle (Thorlabs APT protocol, "TDC001 scaling")
+APT_VELOCITY_SCALE = 2048 / 6e6 * 65536             # ≈ 22.37
+APT_ACCEL_SCALE = (2048 / 6e6) ** 2 * 65536         # ≈ 0.00764
+APT_PARAM_MAX = 2**31 - 1                           # velocity parameters are signed 32‑bit fields
+
+# ══════════════════════════════ instrumentation hook ══════════════════════════
+
+class Instrumentation:
+    """Receives timings from every :class:`TDCController` – override what you need.
+
+    Install one with ``TDCController.instrumentation = MyInstrumentation()``.
+    While it is ``None`` (the default) the controller skips all bookkeeping.
+    Methods may run on driver threads, so keep them short and thread‑safe.
+    """
+
+    def serial_rtt(self, ctrl: "TDCController", seconds: float) -> None:
+        """Status request written → matching status reply received."""
+
+    def waited(self, ctrl: "TDCController", seconds: float) -> None:
+        """Time spent in one ``_wait_until`` (sync or async)."""
+
+    def move_done(self, ctrl: "TDCController", action: str, seconds: float) -> None:
+        """A waited move / home finished: command sent → completion detected."""
+
+    def span(self, ctrl: "TDCController", op: str, phases: Dict[str, float]) -> None:
+        """Per‑phase seconds of one waited move / home (see :class:`_Trace`)."""
+
+    def status_read(self, ctrl: "TDCController", seconds: float) -> None:
+        """One read of :attr:`TDCController.status`."""
+
+    def device_error(self, ctrl: "TDCController", code: int, notes: str) -> None:
+        """The cube reported an error through the driver's error callback."""
+
+
+class Tee(Instrumentation):
+    """Forward every event to several instrumentations."""
+
+    def __init__(self, *targets: Instrumentation) -> None:
+        self.targets = targets
+
+    def serial_rtt(self, ctrl, seconds):
+        for t in self.targets:
+            t.serial_rtt(ctrl, seconds)
+
+    def waited(self, ctrl, seconds):
+        for t in self.targets:
+            t.waited(ctrl, seconds)
+
+    def move_done(self, ctrl, action, seconds):
+        for t in self.targets:
+            t.move_done(ctrl, action, seconds)
+
+    def span(self, ctrl, op, phases):
+        for t in self.targets:
+            t.span(ctrl, op, phases)
+
+    def status_read(self, ctrl, seconds):
+        for t in self.targets:
+            t.status_read(ctrl, seconds)
+
+    def device_error(self, ctrl, code, notes):
+        for t in self.targets:
+            t.device_error(ctrl, code, notes)
+
+
+class TimingCollector(Instrumentation):
+    """Keep the last *keep* samples of every ``(op, phase)`` and report percentiles.
+
+    >>> TDCController.instrumentation = timings = TimingCollector()
+    >>> cube.move_relative(1000); timings.summary()["move_relative"]["to_motion"]["p50"]
+    """
+
+    def __init__(self, keep: int = 10_000) -> None:
+        self.keep = keep
+        self._lock = threading.Lock()
+        self._samples: Dict[Tuple[str, str], Deque[float]] = {}
+
+    def add(self, op: str, phase: str, seconds: float) -> None:
+        with self._lock:
+            window = self._samples.get((op, phase))
+            if window is None:
+                window = self._samples[(op, phase)] = deque(maxlen=self.keep)
+            window.append(seconds)
+
+    def serial_rtt(self, ctrl, seconds):
+        self.add("serial", "rtt", seconds)
+
+    def waited(self, ctrl, seconds):
+        self.add("wait_until", "total", seconds)
+
+    def span(self, ctrl, op, phases):
+        for phase, seconds in phases.items():
+            self.add(op, phase, seconds)
+
+    def status_read(self, ctrl, seconds):
+        self.add("status", "read", seconds)
+
+    def summary(self) -> Dict[str, Dict[str, Dict[str, float]]]:
+        """``{op: {phase: {"n", "p50", "p95", "p99", "max"}}}`` – times in ms."""
+        with self._lock:
+            snapshot = {key: sorted(window) for key, window in self._samples.items()}
+        out: Dict[str, Dict[str, Dict[str, float]]] = {}
+        for (op, phase), xs in sorted(snapshot.items()):
+            pick = lambda q: xs[min(len(xs) - 1, int(q * len(xs)))] * 1e3
+            out.setdefault(op, {})[phase] = {
+                "n": len(xs), "p50": round(pick(0.50), 4), "p95": round(pick(0.95), 4),
+                "p99": round(pick(0.99), 4), "max": round(xs[-1] * 1e3, 4),
+            }
+        return out
+
+    def reset(self) -> None:
+        with self._lock:
+            self._samples.clear()
+
+
+class _Trace:
+    """Monotonic timestamps of one move, filled in by caller and driver thread.
+
+    Phases reported to :meth:`Instrumentation.span`:
+
+    * ``command``   – the driver call (bytes queued to the serial port)
+    * ``to_motion`` – command sent → first status with a motion flag set
+    * ``motion``    – first motion flag → completion message / flags cleared
+    * ``detection`` – that message → the waiting caller woke up
+    * ``total``     – command call → caller woke up
+    """
+
+    __slots__ = ("t0", "sent", "motion", "stop")
+
+    def __init__(self) -> None:
+        self.t0 = time.monotonic()
+        self.sent = self.motion = self.stop = None
+
+    def observe(self, msg: str, moving: bool) -> None:  # driver thread, under _changed
+        if self.sent is None or self.stop is not None:
+            return
+        now = time.monotonic()
+        if moving:
+            if self.motion is None:
+                self.motion = now
+        elif msg in _COMPLETION_MSGS or self.motion is not None:
+            self.stop = now
+
+    def phases(self, woke: float) -> Dict[str, float]:
+        out = {"command": self.sent - self.t0, "total": woke - self.t0}
+        if self.motion is not None:
+            out["to_motion"] = self.motion - self.sent
+        if self.stop is not None:
+            if self.motion is not None:
+                out["motion"] = self.stop - self.motion
+            out["detection"] = max(0.0, woke - self.stop)
+        return out
 
 # ══════════════════════════════ helper functions ══════════════════════════════
 
-def find_tdc001_ports(
+def find_tdc001_devices(
     *,
     vendor_ids: tuple[int, ...] = (0x0403, 0x1313),   # common FTDI / Thorlabs USB VIDs
     serial_prefix: str = "83",                       # TDC001 cubes usually start with 83‑‑
-) -> List[str]:
-    """Return *device strings* (e.g. ``'/dev/ttyUSB0'``) for attached TDC001 cubes."""
-    ports: List[str] = []                             # → collected matches
+) -> Dict[str, str]:
+    """Return ``{serial_number: device}`` (e.g. ``{'83812345': '/dev/ttyUSB0'}``) for attached cubes."""
+    found: Dict[str, str] = {}                        # → collected matches
 
     for p in list_ports.comports():                   # → every serial device
         if p.vid not in vendor_ids:                   # ✱ vendor mismatch
@@ -55,14 +231,64 @@ def find_tdc001_ports(
             continue
         if not p.serial_number.startswith(serial_prefix):  # ✱ not a cube
             continue
-        ports.append(p.device)                        # ✱ good → save
-    return ports                                      # → hand back list
+        found[p.serial_number] = p.device             # ✱ good → save
+    if os.getenv("TDC_SIMULATE"):                     # ✱ virtual cubes for hardware‑free runs
+        from tdc_sim import simulated_devices         #   (imported lazily – rarely needed)
+        found.update(simulated_devices())
+    return found                                      # → hand back mapping
+
+
+def find_tdc001_ports(**filters) -> List[str]:
+    """Return *device strings* (e.g. ``'/dev/ttyUSB0'``) for attached TDC001 cubes."""
+    return list(find_tdc001_devices(**filters).values())  # same filter, ports only
+
+# ══════════════════════════════ driver with listeners ═════════════════════════
+
+class _EventTDC001(TDC001):
+    """:class:`TDC001` that calls ``listener(msg_name)`` after every message.
+
+    The stock driver only *stores* incoming status in ``status_``; this tiny
+    subclass lets :class:`TDCController` wake up the moment something arrives
+    instead of sleeping and re‑checking.
+    """
+
+    def __init__(self, *args, **kwargs) -> None:
+        self._listeners: List[Callable[[str], None]] = []  # set *before* the driver thread starts
+        self.on_rtt: Optional[Callable[[float], None]] = None  # status poll round trip, seconds
+        self._poll_sent: Optional[float] = None
+        super().__init__(*args, **kwargs)
+
+    def add_listener(self, fn: Callable[[str], None]) -> None:
+        self._listeners.append(fn)
+
+    def remove_listener(self, fn: Callable[[str], None]) -> None:
+        if fn in self._listeners:
+            self._listeners.remove(fn)
+
+    def _write(self, command_bytes) -> None:
+        if command_bytes[:2] == _STATUS_REQUEST and self._poll_sent is None:
+            self._poll_sent = time.monotonic()       # time the poll → reply round trip
+        super()._write(command_bytes)
+
+    def _process_message(self, m) -> None:
+        if m.msg == "mot_get_dcstatusupdate" and self._poll_sent is not None:
+            rtt, self._poll_sent = time.monotonic() - self._poll_sent, None
+            if self.on_rtt is not None:
+                self.on_rtt(rtt)
+        super()._process_message(m)                  # update status_ first …
+        for fn in tuple(self._listeners):            # … then tell everyone
+            try:
+                fn(m.msg)
+            except Exception:                        # never kill the driver's read loop
+                log.exception("TDC001 message listener failed")
 
 # ══════════════════════════════ main wrapper class ════════════════════════════
 
 class TDCController:
     """Beginner‑friendly façade over :class:`thorlabs_apt_device.TDC001`."""
 
+    instrumentation: Optional[Instrumentation] = None  # shared by all cubes, see above
+
     # ➊ constructor – open serial port & start background polling
     def __init__(
         self,
@@ -70,8 +296,27 @@ class TDCController:
         *,                                           # ⬑ forces the rest to be keyword‑only
         enable_after_init: bool = True,              # auto‑enable motor driver?
         poll_delay: float = 0.1,                     # seconds to let status thread spin up
+        settle_time: float = 0.3,                    # fallback if a move never reports back
     ) -> None:
-        self._cube = TDC001(serial_port=serial_port, home=False)  # low‑level driver
+        self.serial_port = serial_port               # remembered so registries can find us again
+        self.settle_time = settle_time
+        self._changed = threading.Condition()        # notified on every driver message
+        self._updates = 0                            # messages seen so far
+        self._completions = 0                        # completion messages seen so far
+        self._moving_seen = 0                        # value of _updates when last seen moving
+        self.errors = 0                              # errors reported by the cube
+        self._trace: Optional[_Trace] = None         # current move, only while instrumented
+        self._jog_restore: Optional[Tuple[float, float]] = None  # speed to put back after a jog
+        self._commands = 0                           # motion commands sent so far (move/home/jog/stop)
+        self._sent: Optional[tuple] = None           # (done, trace, action) of the last wait=False move
+        if serial_port.startswith("sim:"):           # virtual cube → see tdc_sim.py
+            from tdc_sim import SimulatedTDC001
+            self._cube = SimulatedTDC001(serial_port=serial_port, home=False)
+        else:
+            self._cube = _EventTDC001(serial_port=serial_port, home=False)  # low‑level driver
+        self._cube.add_listener(self._on_message)    # wake waiters on new status
+        if hasattr(self._cube, "on_rtt"):
+            self._cube.on_rtt = self._on_rtt         # real serial link only
         self._cube.register_error_callback(self._error_callback)  # print errors
         time.sleep(poll_delay)                       # let polling thread unpack first status
         if enable_after_init:
@@ -80,32 +325,155 @@ class TDCController:
     # ➋ convenience property ----------------------------------------------------
     @property
     def status(self) -> Dict[str, object]:           # expose bay 0 / chan 0 dict
-        return self._cube.status_[0][0]
+        if self.instrumentation is None:             # hot path: one attribute check
+            return self._cube.status_[0][0]
+        t0 = time.monotonic()
+        st = self._cube.status_[0][0]
+        self.instrumentation.status_read(self, time.monotonic() - t0)
+        return st
 
     # ➌ motion helpers ---------------------------------------------------------
     def _wait_until(self, predicate, timeout: float = 120, dt: float = 0.05) -> None:
-        """Block until *predicate()* is True or we exceed *timeout*."""
-        time.sleep(.3)
-        t0 = time.time()
-        while not predicate():
-            if time.time() - t0 > timeout:
-                raise TimeoutError("TDC001 operation timed‑out")
-            time.sleep(dt)
-
-    def move_relative(self, counts: int) -> None:
-        """Jog by *counts* encoder steps relative to current position."""
+        """Block until *predicate()* is True or we exceed *timeout*.
+
+        We sleep on a condition variable that the driver thread notifies for
+        every incoming message, so we wake as soon as the status changes;
+        *dt* only bounds how long we go without re‑checking.
+        """
+        t0 = time.monotonic()
+        deadline = t0 + timeout
+        try:
+            with self._changed:
+                while not predicate():
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        raise TimeoutError("TDC001 operation timed‑out")
+                    self._changed.wait(min(dt, remaining))
+        finally:
+            if self.instrumentation is not None:
+                self.instrumentation.waited(self, time.monotonic() - t0)
+
+    def _finished(self, ready: Callable[[], bool]) -> Callable[[], bool]:
+        """Build a predicate for "the command sent *after* this call is done".
+
+        Done means *ready()* holds **and** the cube has shown it acted on the
+        command: a completion message arrived, or it was seen moving.  Moves
+        that never report anything (e.g. zero length) count as done once
+        *ready()* has held for ``settle_time`` seconds.
+        """
+        with self._changed:
+            c0, u0 = self._completions, self._updates
+        t0 = time.monotonic()
+
+        def done() -> bool:
+            if not ready():
+                return False
+            if self._completions > c0 or self._moving_seen > u0:
+                return True
+            return time.monotonic() - t0 >= self.settle_time
+        return done
+
+    def wait_idle(self, timeout: float = 120) -> None:
+        """Block until neither motion flag is set (no settle delay)."""
+        self._wait_until(self._is_idle, timeout=timeout)
+
+    def wait_move(self, timeout: float = 120) -> None:
+        """Block until the last move/home sent with ``wait=False`` has finished.
+
+        Same completion rule as ``wait=True`` – so several cubes can be
+        started first and waited for afterwards.
+        """
+        if self._sent is None:
+            return
+        done, trace, action = self._sent
+        self._wait_until(done, timeout=timeout)
+        if self._sent is not None and self._sent[0] is done:
+            self._sent = None
+        self._end(trace, action)
+
+    def move_relative(self, counts: int, *, wait: bool = True) -> None:
+        """Jog by *counts* encoder steps relative to current position.
+
+        ``wait=False`` only sends the command – callers that track completion
+        themselves (e.g. the server's job runner) use this.
+        """
+        done = self._finished(self._is_idle)        # mark *before* sending
+        trace = self._begin()
+        self._restore_speed()
+        self._commands += 1
         self._cube.move_relative(counts)
-        self._wait_until(self._is_idle)
+        if trace is not None:
+            trace.sent = time.monotonic()
+        if wait:
+            self._wait_until(done)
+            self._end(trace, "move_relative")
+        else:
+            self._sent = (done, trace, "move_relative")
 
-    def move_absolute(self, position: int) -> None:
+    def move_absolute(self, position: int, *, wait: bool = True) -> None:
         """Move to *position* encoder counts from mechanical zero."""
+        done = self._finished(self._is_idle)
+        trace = self._begin()
+        self._restore_speed()
+        self._commands += 1
         self._cube.move_absolute(position)
-        self._wait_until(self._is_idle)
+        if trace is not None:
+            trace.sent = time.monotonic()
+        if wait:
+            self._wait_until(done)
+            self._end(trace, "move_absolute")
+        else:
+            self._sent = (done, trace, "move_absolute")
 
-    def home(self) -> None:
+    def home(self, *, wait: bool = True) -> None:
         """Run cube homing sequence."""
+        done = self._finished(lambda: self.status["homed"])
+        trace = self._begin()
+        self._restore_speed()
+        self._commands += 1
         self._cube.home()
-        self._wait_until(lambda: self.status["homed"], timeout=300)
+        if trace is not None:
+            trace.sent = time.monotonic()
+        if wait:
+            self._wait_until(done, timeout=300)
+            self._end(trace, "home")
+        else:
+            self._sent = (done, trace, "home")
+
+    def jog(self, direction: str = "forward", velocity: Optional[float] = None,
+            acceleration: Optional[float] = None) -> None:
+        """Run continuously towards *direction* until :meth:`stop` is called.
+
+        *velocity* is in counts/s and *acceleration* in counts/s² (``None`` →
+        keep the cube's current value); both are converted to APT units here.
+        Calling again while jogging changes direction or speed on the fly;
+        :meth:`stop` (or any other move) puts back the speed normal moves use.
+        """
+        if direction not in ("forward", "reverse"):
+            raise ValueError(f"direction must be 'forward' or 'reverse', not {direction!r}")
+        if velocity is not None and velocity <= 0 or acceleration is not None and acceleration <= 0:
+            raise ValueError("velocity and acceleration must be positive")
+        for name, value, scale in (("velocity", velocity, APT_VELOCITY_SCALE),
+                                   ("acceleration", acceleration, APT_ACCEL_SCALE)):
+            if value is not None and round(value * scale) > APT_PARAM_MAX:
+                raise ValueError(f"{name} must be at most {APT_PARAM_MAX / scale:.0f}")
+        if velocity is not None or acceleration is not None:
+            params = self._cube.velparams            # driver's copy, already in APT units
+            if self._jog_restore is None and params["max_velocity"] > 0:
+                self._jog_restore = (params["acceleration"], params["max_velocity"])
+            base = self._jog_restore or (params["acceleration"], params["max_velocity"])
+            self._cube.set_velocity_params(
+                round(acceleration * APT_ACCEL_SCALE) if acceleration is not None else base[0],
+                round(velocity * APT_VELOCITY_SCALE) if velocity is not None else base[1],
+            )
+        self._commands += 1
+        self._cube.move_velocity(direction)          # re‑sent so a new speed takes effect now
+
+    def stop(self, *, immediate: bool = True) -> None:
+        """Abort the current motion (``immediate=False`` → profiled ramp‑down)."""
+        self._commands += 1
+        self._cube.stop(immediate=immediate)
+        self._restore_speed()
 
     def identify(self) -> None:
         """Flash the cube LED (helps to know which cube you’re talking to)."""
@@ -118,11 +486,13 @@ class TDCController:
         return {name: str(inspect.signature(getattr(self, name))) for name in pub}
 
     # ➎ teardown ---------------------------------------------------------------
-    def close(self) -> None:
-        try:
-            self._cube.stop(immediate=True)          # abort motion if moving
-        except Exception:
-            pass
+    def close(self, *, stop: bool = True) -> None:
+        """Release the port; ``stop=False`` leaves a running move alone (duplicate handles)."""
+        if stop:
+            try:
+                self._cube.stop(immediate=True)      # abort motion if moving
+            except Exception:
+                pass
         self._cube.close()                           # close serial & threads
 
     def __enter__(self) -> "TDCController":          # enable "with" syntax
@@ -133,13 +503,230 @@ class TDCController:
         return False                                 # propagate exceptions
 
     # ➏ internal helpers -------------------------------------------------------
+    def _restore_speed(self) -> None:
+        """Undo a jog's speed change (no‑op otherwise)."""
+        if self._jog_restore is not None:
+            accel, vmax = self._jog_restore
+            self._jog_restore = None
+            self._cube.set_velocity_params(accel, vmax)
+
     def _is_idle(self) -> bool:                      # both mov flags False → idle
         return not (self.status["moving_forward"] or self.status["moving_reverse"])
 
-    @staticmethod
-    def _error_callback(source, msgid, code, notes):
+    def _on_message(self, msg: str) -> None:         # runs on the driver thread
+        with self._changed:
+            self._updates += 1
+            if msg in _COMPLETION_MSGS:
+                self._completions += 1
+            moving = not self._is_idle()
+            if moving:
+                self._moving_seen = self._updates
+            if self._trace is not None:
+                self._trace.observe(msg, moving)
+            self._changed.notify_all()
+
+    def _on_rtt(self, seconds: float) -> None:       # runs on the driver thread
+        if self.instrumentation is not None:
+            self.instrumentation.serial_rtt(self, seconds)
+
+    def _begin(self) -> Optional[_Trace]:
+        """Start timing the next command (``None`` → not instrumented)."""
+        if self.instrumentation is None:
+            return None
+        trace = self._trace = _Trace()
+        return trace
+
+    def _end(self, trace: Optional[_Trace], action: str) -> None:
+        """The caller has seen *action* finish – report its phases."""
+        inst = self.instrumentation
+        if trace is None or inst is None or trace.sent is None:
+            return
+        if self._trace is trace:
+            self._trace = None
+        phases = trace.phases(time.monotonic())
+        inst.move_done(self, action, phases["total"])
+        inst.span(self, action, phases)
+
+    def _error_callback(self, source, msgid, code, notes):
+        self.errors += 1
+        if self.instrumentation is not None:
+            self.instrumentation.device_error(self, code, notes)
         print(f"[TDC001‑{source:#x}] Error {code}: {notes}")
 
+# ══════════════════════════════ asyncio wrapper ═══════════════════════════════
+
+class MoveSuperseded(RuntimeError):
+    """A retargeting move was replaced before it finished.
+
+    ``superseded_by`` is the newer target, or ``None`` if some other command
+    (a plain move, home, stop …) took over the cube.
+    """
+
+    def __init__(self, position: int, superseded_by: Optional[int]) -> None:
+        by = "another command" if superseded_by is None else f"a move to {superseded_by}"
+        super().__init__(f"Move to {position} superseded by {by}")
+        self.position = position
+        self.superseded_by = superseded_by
+
+
+class AsyncTDCController:
+    """asyncio twin of :class:`TDCController` – every motion call is awaitable.
+
+    Waiting costs no thread: the driver thread merely schedules a wake‑up on
+    the event loop (``call_soon_threadsafe``) when a message arrives, so one
+    loop can drive any number of cubes at once.
+
+    >>> async with await AsyncTDCController.open("/dev/ttyUSB0") as cube:
+    ...     await cube.move_relative(1000)
+    """
+
+    def __init__(self, ctrl: TDCController) -> None:
+        self.ctrl = ctrl                             # the blocking controller we wrap
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._changed = asyncio.Event()              # set (on the loop) after driver messages
+        self._waiting = 0                            # only bother the loop while someone waits
+        self._retargets = 0                          # bumped by every move_absolute(retarget=True)
+        self._target: Optional[int] = None           # latest retarget position
+        ctrl._cube.add_listener(self._on_message)
+
+    @classmethod
+    async def open(cls, serial_port: str, **kwargs) -> "AsyncTDCController":
+        """Open the port in a worker thread (it sleeps briefly) and wrap it."""
+        return cls(await asyncio.to_thread(TDCController, serial_port, **kwargs))
+
+    # ➊ pass‑through properties ----------------------------------------------
+    @property
+    def serial_port(self) -> str:
+        return self.ctrl.serial_port
+
+    @property
+    def status(self) -> Dict[str, object]:
+        return self.ctrl.status
+
+    # ➋ waiting ---------------------------------------------------------------
+    async def _wait_until(self, predicate, timeout: float = 120, dt: float = 0.05) -> None:
+        """Await *predicate()* – same contract as :meth:`TDCController._wait_until`."""
+        loop = self._loop = asyncio.get_running_loop()
+        t0 = loop.time()
+        deadline = t0 + timeout
+        self._waiting += 1
+        try:
+            while True:
+                self._changed.clear()                # clear first → no lost wake‑ups
+                if predicate():
+                    return
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    raise TimeoutError("TDC001 operation timed‑out")
+                try:
+                    await asyncio.wait_for(self._changed.wait(), min(dt, remaining))
+                except asyncio.TimeoutError:
+                    pass                             # periodic re‑check, like the sync path
+        finally:
+            self._waiting -= 1
+            if self.ctrl.instrumentation is not None:
+                self.ctrl.instrumentation.waited(self.ctrl, loop.time() - t0)
+
+    async def wait_idle(self, timeout: float = 120) -> None:
+        await self._wait_until(self.ctrl._is_idle, timeout=timeout)
+
+    async def wait_move(self, timeout: float = 120) -> None:
+        """Await the last move/home sent with ``wait=False`` – see :meth:`TDCController.wait_move`."""
+        sent = self.ctrl._sent
+        if sent is None:
+            return
+        done, trace, action = sent
+        await self._wait_until(done, timeout=timeout)
+        if self.ctrl._sent is sent:
+            self.ctrl._sent = None
+        self.ctrl._end(trace, action)
+
+    # ➌ motion ----------------------------------------------------------------
+    async def move_relative(self, counts: int) -> None:
+        self.ctrl.move_relative(counts, wait=False)  # only queues bytes – never blocks
+        await self.wait_move()
+
+    async def move_absolute(self, position: int, *, retarget: bool = False, tolerance: int = 10) -> None:
+        """Move to *position*; ``retarget=True`` → latest target wins.
+
+        A retargeting move sends its command at once even mid‑motion, and an
+        earlier retargeting move still waiting raises :class:`MoveSuperseded`
+        right away instead of waiting for the stage to reach the newer target.
+        It only counts as done within *tolerance* counts of *position*.
+        """
+        if retarget:
+            return await self._retarget(position, tolerance)
+        self.ctrl.move_absolute(position, wait=False)
+        await self.wait_move()
+
+    async def _retarget(self, position: int, tolerance: int) -> None:
+        self._retargets += 1
+        seq, self._target = self._retargets, position
+        self._changed.set()                          # wake the move we replace
+        self.ctrl.move_absolute(position, wait=False)
+        (ready, trace, _), self.ctrl._sent = self.ctrl._sent, None
+        sent = self.ctrl._commands
+        off_since: List[float] = []                  # idle but off target since … (stale idle?)
+
+        def replaced() -> bool:
+            return self._retargets != seq or self.ctrl._commands != sent
+
+        def settled() -> bool:
+            if replaced():
+                return True
+            if not ready():
+                off_since.clear()
+                return False
+            if abs(self.status["position"] - position) <= tolerance:
+                return True
+            if not off_since:                        # e.g. the old move's completion
+                off_since.append(time.monotonic())
+            return time.monotonic() - off_since[0] >= self.ctrl.settle_time
+
+        await self._wait_until(settled)
+        if self._retargets != seq:
+            raise MoveSuperseded(position, self._target)
+        if self.ctrl._commands != sent:
+            raise MoveSuperseded(position, None)
+        if abs(self.status["position"] - position) > tolerance:
+            raise RuntimeError(f"Stopped at {self.status['position']}, not at target {position}")
+        self.ctrl._end(trace, "move_absolute")
+
+    async def home(self) -> None:
+        self.ctrl.home(wait=False)
+        await self.wait_move(timeout=300)
+
+    async def jog(self, direction: str = "forward", velocity: Optional[float] = None,
+                  acceleration: Optional[float] = None) -> None:
+        self.ctrl.jog(direction, velocity, acceleration)  # returns at once – motion continues
+
+    async def stop(self, *, immediate: bool = True) -> None:
+        self.ctrl.stop(immediate=immediate)
+
+    async def identify(self) -> None:
+        self.ctrl.identify()
+
+    # ➍ teardown --------------------------------------------------------------
+    async def close(self) -> None:
+        self._detach()
+        await asyncio.to_thread(self.ctrl.close)
+
+    async def __aenter__(self) -> "AsyncTDCController":
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.close()
+        return False
+
+    # ➎ internal helpers ------------------------------------------------------
+    def _detach(self) -> None:                       # stop listening, leave ctrl open
+        self.ctrl._cube.remove_listener(self._on_message)
+
+    def _on_message(self, msg: str) -> None:         # runs on the driver thread
+        loop = self._loop
+        if self._waiting and loop is not None and not loop.is_closed():
+            loop.call_soon_threadsafe(self._changed.set)
+
 # ══════════════════════════════ CLI entry‑point ═══════════════════════════════
 
 def _interactive_cli() -> None:
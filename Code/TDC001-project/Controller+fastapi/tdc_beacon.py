@@ -0,0 +1,134 @@
+"""tdc_beacon.py – answer "is there a TDC001 backend out there?" over UDP.
+
+Without this, a GUI finds backends by knocking on port 8000 of every address
+it can think of.  :class:`Beacon` instead listens on UDP port 8000 (the
+broadcast address *and* the multicast group :data:`GROUP`) and replies to a
+one‑datagram query with everything a client needs::
+
+    → {"type": "discover"}
+    ← {"type": "tdc001", "backend": "TDC001", "http_port": 8000,
+       "url": null, "devices": ["83812345", ...], "version": "1.5.0"}
+
+``url`` is only set when ``TDC_PUBLIC_URL`` is (e.g. behind Docker NAT);
+otherwise clients use the address the reply came from.  The beacon also
+announces itself to the multicast group every *interval* seconds so passive
+listeners notice new backends.  The matching client lives in the GUI's
+``api.py`` (:func:`api.beacon_backends`).
+
+Set ``TDC_BEACON=0`` to turn it off.
+"""
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import socket
+import struct
+from typing import Callable, List, Optional, Tuple
+
+__all__ = ["Beacon", "GROUP", "PORT"]
+
+log = logging.getLogger("tdc-server")
+
+GROUP = "239.255.80.1"                                # site‑local multicast group
+PORT = 8000                                           # UDP – same number as the HTTP API
+
+
+def make_socket(port: int, group: str = GROUP) -> socket.socket:
+    """UDP socket bound to *port* on every interface, joined to *group* if possible."""
+    sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM, socket.IPPROTO_UDP)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    if hasattr(socket, "SO_REUSEPORT"):               # let several backends share a host
+        try:
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEPORT, 1)
+        except OSError:
+            pass
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_BROADCAST, 1)
+    sock.bind(("", port))
+    try:
+        mreq = struct.pack("4s4s", socket.inet_aton(group), socket.inet_aton("0.0.0.0"))
+        sock.setsockopt(socket.IPPROTO_IP, socket.IP_ADD_MEMBERSHIP, mreq)
+        sock.setsockopt(socket.IPPROTO_IP, socket.IP_MULTICAST_TTL, 1)   # stay on this LAN
+    except OSError as e:                              # no multicast route – broadcast still works
+        log.info("UDP beacon: multicast unavailable (%s)", e)
+    sock.setblocking(False)
+    return sock
+
+
+class _Protocol(asyncio.DatagramProtocol):
+    def __init__(self, beacon: "Beacon") -> None:
+        self.beacon = beacon
+
+    def datagram_received(self, data: bytes, addr: Tuple[str, int]) -> None:
+        try:
+            msg = json.loads(data)
+        except ValueError:
+            return                                    # not for us
+        if isinstance(msg, dict) and msg.get("type") == "discover" and msg.get("backend", "TDC001") == "TDC001":
+            self.beacon.reply(addr)
+
+
+class Beacon:
+    """UDP responder + periodic multicast announcer for one backend."""
+
+    def __init__(
+        self,
+        devices: Callable[[], List[str]],
+        *,
+        http_port: int = 8000,
+        port: int = PORT,
+        interval: float = 30.0,
+        version: Optional[str] = None,
+        public_url: Optional[str] = None,
+    ) -> None:
+        self.devices = devices                        # → current cube serials
+        self.http_port = http_port
+        self.port = port
+        self.interval = interval
+        self.version = version
+        self.public_url = public_url
+        self._transport: Optional[asyncio.DatagramTransport] = None
+        self._task: Optional[asyncio.Task] = None
+
+    # ─── lifecycle ────────────────────────────────────────────────────────
+    async def start(self) -> None:
+        loop = asyncio.get_running_loop()
+        self._transport, _ = await loop.create_datagram_endpoint(
+            lambda: _Protocol(self), sock=make_socket(self.port))
+        self._task = loop.create_task(self._announce())
+        log.info("UDP beacon listening on port %d", self.port)
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        if self._transport is not None:
+            self._transport.close()
+            self._transport = None
+
+    # ─── messages ─────────────────────────────────────────────────────────
+    def payload(self) -> bytes:
+        return json.dumps({
+            "type": "tdc001",
+            "backend": "TDC001",
+            "http_port": self.http_port,
+            "url": self.public_url,
+            "devices": self.devices(),
+            "version": self.version,
+        }).encode()
+
+    def reply(self, addr: Tuple[str, int]) -> None:
+        if self._transport is not None:
+            self._transport.sendto(self.payload(), addr)
+
+    async def _announce(self) -> None:
+        while True:
+            try:
+                self._transport.sendto(self.payload(), (GROUP, self.port))
+            except OSError as e:                      # e.g. no multicast route
+                log.debug("UDP beacon announce failed: %s", e)
+            await asyncio.sleep(self.interval)
@@ -0,0 +1,330 @@
+#!/usr/bin/env python3
+"""tdc_bench.py – end‑to‑end motion latency benchmark.
+
+Times one relative move at every layer of the stack and reports p50/p95/p99
+per stage, so a hot‑path regression shows up as a number instead of as
+"scans got slower"::
+
+    python tdc_bench.py                               # simulated cube, 50 moves
+    python tdc_bench.py --port /dev/ttyUSB0 --steps 500 --out bench-1.5.0.json
+    python tdc_bench.py --compare bench-1.4.0.json    # print the change per stage
+
+Stages (all in milliseconds)
+~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+``wait_until.wake``
+    a thread notifies the controller's condition → ``_wait_until`` returns.
+    Pure waiting overhead, no cube involved.
+``controller.command_to_motion``
+    ``TDCController.move_relative`` called → first driver message showing motion.
+``controller.end_to_return``
+    completion message from the cube → ``move_relative`` returns.
+``async.end_to_return``
+    the same through :class:`~tdc001.AsyncTDCController` on an event loop.
+``http.request_to_motion``
+    ``APIClient.move_rel`` called → first driver message showing motion
+    (through ``/move_rel`` on an in‑process uvicorn server over loopback).
+``http.end_to_response``
+    completion message → ``APIClient.move_rel`` returns.
+``*.total``
+    the whole call.
+
+Results are written as JSON (``--out``) so runs can be compared between
+releases.  A simulated cube (``sim:<n>``, see ``tdc_sim.py``) is used unless
+``--port`` names real hardware.
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import os
+import platform
+import socket
+import sys
+import threading
+import time
+from typing import Callable, Dict, List, Optional
+
+SCHEMA = 1                                           # bump when the JSON layout changes
+
+
+# ───────────── statistics ─────────────
+
+def percentile(values: List[float], q: float) -> float:
+    """*q*‑th percentile (0…100) with linear interpolation between ranks."""
+    data = sorted(values)
+    if not data:
+        return float("nan")
+    k = (len(data) - 1) * q / 100
+    lo = int(k)
+    hi = min(lo + 1, len(data) - 1)
+    return data[lo] + (data[hi] - data[lo]) * (k - lo)
+
+
+def summarize(samples: List[float]) -> Dict[str, float]:
+    """Turn raw seconds into the millisecond summary stored in the JSON file."""
+    ms = [s * 1000 for s in samples]
+    return {
+        "n": len(ms),
+        "p50": round(percentile(ms, 50), 3),
+        "p95": round(percentile(ms, 95), 3),
+        "p99": round(percentile(ms, 99), 3),
+        "mean": round(sum(ms) / len(ms), 3) if ms else float("nan"),
+        "max": round(max(ms), 3) if ms else float("nan"),
+    }
+
+
+# ───────────── timestamps from the driver thread ─────────────
+
+class MoveProbe:
+    """Driver listener that timestamps the first "moving" and the completion message.
+
+    It is put *first* in the driver's listener list so the timestamps are
+    taken before the controller wakes any waiters.
+    """
+
+    def __init__(self, ctrl) -> None:
+        from tdc001 import _COMPLETION_MSGS
+        self._ctrl = ctrl
+        self._done_msgs = _COMPLETION_MSGS
+        self.moving_at: Optional[float] = None
+        self.done_at: Optional[float] = None
+        ctrl._cube._listeners.insert(0, self)
+
+    def arm(self) -> None:
+        self.moving_at = self.done_at = None
+
+    def __call__(self, msg: str) -> None:
+        now = time.perf_counter()
+        done = msg in self._done_msgs
+        if self.moving_at is None and (done or not self._ctrl._is_idle()):
+            self.moving_at = now                     # a move too short to be seen moving
+        if self.done_at is None and done:
+            self.done_at = now
+
+    def detach(self) -> None:
+        self._ctrl._cube.remove_listener(self)
+
+
+class Stages:
+    """Collect raw samples per stage name."""
+
+    def __init__(self) -> None:
+        self.samples: Dict[str, List[float]] = {}
+
+    def add(self, name: str, seconds: Optional[float]) -> None:
+        if seconds is not None:
+            self.samples.setdefault(name, []).append(seconds)
+
+    def record_move(self, prefix: str, probe: MoveProbe, t0: float, t1: float, start_stage: str) -> None:
+        self.add(f"{prefix}.total", t1 - t0)
+        if probe.moving_at is not None:
+            self.add(f"{prefix}.{start_stage}", probe.moving_at - t0)
+        if probe.done_at is not None:
+            self.add(f"{prefix}.end_to_{'response' if prefix == 'http' else 'return'}", t1 - probe.done_at)
+
+
+# ───────────── benchmark stages ─────────────
+
+def bench_wait_until(ctrl, stages: Stages, rounds: int) -> None:
+    """Notify the controller's condition from another thread; time the wake‑up."""
+    for _ in range(rounds):
+        flag = {"set": False, "at": 0.0}
+
+        def poke() -> None:
+            time.sleep(0.002)                        # let the waiter go to sleep first
+            with ctrl._changed:
+                flag["set"], flag["at"] = True, time.perf_counter()
+                ctrl._changed.notify_all()
+
+        t = threading.Thread(target=poke)
+        t.start()
+        ctrl._wait_until(lambda: flag["set"], timeout=5)
+        stages.add("wait_until.wake", time.perf_counter() - flag["at"])
+        t.join()
+
+
+def bench_controller(ctrl, stages: Stages, moves: int, steps: int) -> None:
+    probe = MoveProbe(ctrl)
+    try:
+        for i in range(moves):
+            probe.arm()
+            t0 = time.perf_counter()
+            ctrl.move_relative(steps if i % 2 == 0 else -steps)
+            stages.record_move("controller", probe, t0, time.perf_counter(), "command_to_motion")
+    finally:
+        probe.detach()
+
+
+def bench_async(ctrl, stages: Stages, moves: int, steps: int) -> None:
+    from tdc001 import AsyncTDCController
+
+    async def run() -> None:
+        actrl = AsyncTDCController(ctrl)
+        probe = MoveProbe(ctrl)
+        try:
+            for i in range(moves):
+                probe.arm()
+                t0 = time.perf_counter()
+                await actrl.move_relative(steps if i % 2 == 0 else -steps)
+                stages.record_move("async", probe, t0, time.perf_counter(), "command_to_motion")
+        finally:
+            probe.detach()
+            actrl._detach()
+
+    asyncio.run(run())
+
+
+def _client(base: str):
+    """The GUI's own :class:`APIClient` when ``../Gui`` is around, else a stand‑in."""
+    gui = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "Gui")
+    if os.path.isdir(gui) and gui not in sys.path:
+        sys.path.append(gui)
+    try:
+        from api import APIClient
+        return APIClient(base)
+    except ImportError:                              # backend image: no GUI code
+        import requests
+
+        class _Client:                               # same calls APIClient makes
+            def __init__(self) -> None:
+                self.session = requests.Session()
+
+            def connect(self, port: str):
+                r = self.session.post(f"{base}/connect", json={"port": port}, timeout=10)
+                r.raise_for_status()
+                return r.json()
+
+            def move_rel(self, steps: int):
+                r = self.session.post(f"{base}/move_rel", json={"steps": steps}, timeout=150)
+                r.raise_for_status()
+                return r.json()
+
+        return _Client()
+
+
+def bench_http(port: str, stages: Stages, moves: int, steps: int) -> None:
+    """Start ``tdc_server:app`` on a free loopback port in this process and drive it."""
+    import uvicorn
+    import tdc_server
+
+    with socket.socket() as s:                       # grab a free TCP port
+        s.bind(("127.0.0.1", 0))
+        http_port = s.getsockname()[1]
+    server = uvicorn.Server(uvicorn.Config(tdc_server.app, host="127.0.0.1", port=http_port,
+                                           log_level="warning"))
+    thread = threading.Thread(target=server.run, daemon=True)
+    thread.start()
+    try:
+        deadline = time.monotonic() + 15
+        while not server.started:
+            if time.monotonic() > deadline or not thread.is_alive():
+                raise RuntimeError("uvicorn did not start")
+            time.sleep(0.02)
+
+        client = _client(f"http://127.0.0.1:{http_port}")
+        client.connect(port)
+        probe = MoveProbe(tdc_server.registry.get())
+        try:
+            for i in range(moves):
+                probe.arm()
+                t0 = time.perf_counter()
+                client.move_rel(steps if i % 2 == 0 else -steps)
+                stages.record_move("http", probe, t0, time.perf_counter(), "request_to_motion")
+        finally:
+            probe.detach()
+    finally:
+        server.should_exit = True
+        thread.join(timeout=15)
+
+
+# ───────────── report ─────────────
+
+def report(results: dict, baseline: Optional[dict] = None) -> str:
+    lines = [f"{'stage':<32}{'n':>5}{'p50':>10}{'p95':>10}{'p99':>10}   (ms)"]
+    base = (baseline or {}).get("stages", {})
+    for name, s in results["stages"].items():
+        line = f"{name:<32}{s['n']:>5}{s['p50']:>10.3f}{s['p95']:>10.3f}{s['p99']:>10.3f}"
+        if name in base:
+            line += f"   p50 {s['p50'] - base[name]['p50']:+.3f}  p99 {s['p99'] - base[name]['p99']:+.3f}"
+        lines.append(line)
+    return "\n".join(lines)
+
+
+def run(port: str, *, moves: int = 50, steps: int = 2000, warmup: int = 2,
+        http: bool = True, progress: Callable[[str], None] = print) -> dict:
+    """Run every stage against *port* and return the JSON‑ready result dict."""
+    from tdc001 import TDCController
+
+    stages = Stages()
+    ctrl = TDCController(port)
+    try:
+        progress("wait_until …")
+        bench_wait_until(ctrl, stages, moves)
+        progress("controller …")
+        bench_controller(ctrl, Stages(), warmup, steps)           # warm‑up, discarded
+        bench_controller(ctrl, stages, moves, steps)
+        progress("async …")
+        bench_async(ctrl, stages, moves, steps)
+    finally:
+        ctrl.close()                                  # free the port for the server
+    if http:
+        progress("http …")
+        bench_http(port, stages, moves, steps)
+
+    return {
+        "schema": SCHEMA,
+        "meta": {
+            "created": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+            "port": port,
+            "moves": moves,
+            "steps": steps,
+            "time_scale": os.getenv("TDC_SIM_TIME_SCALE") if port.startswith("sim:") else None,
+            "api_version": _api_version(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+        },
+        "stages": {name: summarize(v) for name, v in sorted(stages.samples.items())},
+    }
+
+
+def _api_version() -> Optional[str]:
+    try:
+        import tdc_server
+        return tdc_server.app.version
+    except Exception:
+        return None
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    p = argparse.ArgumentParser(description="TDC001 motion latency benchmark")
+    p.add_argument("--port", default="sim:1", help="serial port or sim:<n> (default: sim:1)")
+    p.add_argument("--moves", type=int, default=50, help="moves per stage (default: 50)")
+    p.add_argument("--steps", type=int, default=2000, help="counts per move (default: 2000)")
+    p.add_argument("--time-scale", type=float, default=5.0, help="simulator speed‑up (default: 5)")
+    p.add_argument("--no-http", action="store_true", help="skip the HTTP stages")
+    p.add_argument("--out", help="write results as JSON to this file")
+    p.add_argument("--compare", help="earlier JSON result to diff against")
+    args = p.parse_args(argv)
+
+    if args.port.startswith("sim:"):
+        os.environ["TDC_SIM_TIME_SCALE"] = str(args.time_scale)
+        index = int(args.port.split(":", 1)[1] or 1)
+        if int(os.getenv("TDC_SIMULATE") or 0) < index:
+            os.environ["TDC_SIMULATE"] = str(index)   # let the server find it too
+
+    results = run(args.port, moves=args.moves, steps=args.steps, http=not args.no_http)
+    baseline = None
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+    print(report(results, baseline))
+    if args.out:
+        with open(args.out, "w") as f:
+            json.dump(results, f, indent=2)
+        print(f"Results written to {args.out}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,99 @@
+"""tdc_group.py – move several cubes together and wait for all of them.
+
+Calling ``/move_abs`` on X, then Y, then Z costs the *sum* of the three move
+times.  :func:`move_group` starts every axis in the same event‑loop turn and
+waits on all of them at once, so the group takes as long as its slowest
+axis.  The result says when each axis finished (seconds after the start)::
+
+    {"status": "moved", "elapsed": 1.82, "axes": [
+        {"device": "83812345", "target": 120000, "position": 120000, "finished": 1.82},
+        {"device": "83812346", "target": 5000,   "position": 5000,   "finished": 0.41}]}
+
+If any axis fails (timeout, driver error, …) the others are stopped at once
+and :class:`GroupMoveError` reports the state of every axis.
+"""
+from __future__ import annotations
+
+import asyncio
+import logging
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Sequence
+
+from tdc001 import AsyncTDCController
+
+__all__ = ["AxisMove", "GroupMoveError", "move_group"]
+
+log = logging.getLogger("tdc-server")
+
+
+@dataclass
+class AxisMove:
+    """One axis of a group: absolute *position* or relative *steps*."""
+
+    device: str
+    ctrl: AsyncTDCController
+    position: Optional[int] = None
+    steps: Optional[int] = None
+
+
+class GroupMoveError(RuntimeError):
+    """An axis failed; every axis was stopped.  ``axes`` holds their states."""
+
+    def __init__(self, message: str, axes: List[Dict[str, Any]]) -> None:
+        super().__init__(message)
+        self.axes = axes
+
+
+async def move_group(moves: Sequence[AxisMove]) -> Dict[str, Any]:
+    """Start all *moves* together, wait for all, abort all on the first failure."""
+    loop = asyncio.get_running_loop()
+    t0 = loop.time()
+    report = [{"device": m.device, "state": "running", "finished": None} for m in moves]
+
+    async def run(i: int, m: AxisMove) -> None:
+        if m.position is not None:
+            report[i]["target"] = m.position
+            await m.ctrl.move_absolute(m.position)
+        else:
+            report[i]["target"] = m.ctrl.status["position"] + m.steps
+            await m.ctrl.move_relative(m.steps)
+        report[i].update(state="done", finished=round(loop.time() - t0, 4))
+
+    tasks = [loop.create_task(run(i, m)) for i, m in enumerate(moves)]
+    try:
+        done, pending = await asyncio.wait(tasks, return_when=asyncio.FIRST_EXCEPTION)
+    except asyncio.CancelledError:
+        await _abort(moves, tasks, report)
+        raise
+    failed = [(i, t.exception()) for i, t in enumerate(tasks)
+              if t.done() and not t.cancelled() and t.exception()]
+    if failed:
+        for i, err in failed:
+            report[i].update(state="failed", error=str(err) or type(err).__name__)
+        await _abort(moves, tasks, report)
+        i, err = failed[0]
+        raise GroupMoveError(f"Axis {moves[i].device} failed: {err}", _positions(moves, report))
+    return {"status": "moved", "elapsed": round(loop.time() - t0, 4), "axes": _positions(moves, report)}
+
+
+async def _abort(moves: Sequence[AxisMove], tasks: List[asyncio.Task], report: List[Dict[str, Any]]) -> None:
+    """Cancel every unfinished axis and stop every cube of the group."""
+    for i, task in enumerate(tasks):
+        if not task.done():
+            task.cancel()
+            report[i]["state"] = "aborted"
+    await asyncio.gather(*tasks, return_exceptions=True)
+    for m in moves:
+        try:
+            await m.ctrl.stop()
+        except Exception as e:
+            log.error("Stopping %s after a failed group move failed: %s", m.device, e)
+
+
+def _positions(moves: Sequence[AxisMove], report: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    for m, entry in zip(moves, report):
+        try:
+            entry["position"] = m.ctrl.status["position"]
+        except Exception:
+            entry["position"] = None
+    return report
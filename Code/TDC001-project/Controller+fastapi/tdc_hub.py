@@ -0,0 +1,155 @@
+"""tdc_hub.py – one status sampler shared by every push subscriber.
+
+Rather than each client asking ``/status`` twice a second, :class:`StatusHub`
+copies every registered cube's driver status dict at a fixed, fast interval on
+the server's event loop.  Whenever a copy differs from the last one it bumps a
+global *version* counter and wakes everyone waiting in :meth:`wait_changed`.
+Subscribers (the ``/ws/status`` WebSocket) then send only the fields that
+changed, at most as often as each client asked for.
+
+Reading the status dicts is a handful of in‑memory lookups – the driver
+thread already keeps them fresh – so sampling costs no serial traffic.
+
+Versions start at the server's start time in milliseconds, so a version seen
+before a restart is always older than every version after it.  A short
+per‑device history lets :meth:`StatusHub.changes_since` answer "what changed
+since version *v*" with field diffs (``GET /status/all?since=v``).
+"""
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from collections import deque
+from typing import Deque, Dict, Optional, Tuple
+
+from tdc_registry import DeviceRegistry
+
+__all__ = ["StatusHub", "diff_status"]
+
+log = logging.getLogger("tdc-server")
+
+
+def diff_status(old: Dict[str, object], new: Dict[str, object]) -> Dict[str, object]:
+    """Return the fields of *new* whose value differs from *old*."""
+    return {k: v for k, v in new.items() if old.get(k) != v}
+
+
+class StatusHub:
+    """Sample all cubes every *interval* seconds and publish changes."""
+
+    def __init__(self, registry: DeviceRegistry, *, interval: float = 0.02, history: int = 64) -> None:
+        self.registry = registry
+        self.interval = interval
+        self.version = int(time.time() * 1000)         # bumps on any cube's change
+        self.history = history
+        self._snapshots: Dict[str, Dict[str, object]] = {}
+        self._versions: Dict[str, int] = {}            # device → version of last change
+        self._history: Dict[str, Deque[Tuple[int, Dict[str, object]]]] = {}
+        self._changed: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+
+    # ─── lifecycle ────────────────────────────────────────────────────────
+    def start(self) -> None:
+        """Begin sampling; must be called from the running event loop."""
+        if self._task is None:
+            self._changed = asyncio.Event()
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    # ─── queries ──────────────────────────────────────────────────────────
+    def get(self, device: str) -> Tuple[int, Dict[str, object]]:
+        """Return ``(version, status)`` for *device*; :class:`KeyError` if unknown."""
+        if device not in self._snapshots:
+            self.sample()                              # freshly opened cube
+        return self._versions[device], self._snapshots[device]
+
+    def changes_since(self, since: Optional[int] = None) -> Dict[str, dict]:
+        """Devices changed after version *since* (all if ``None``).
+
+        Each entry is ``{"version": v, "changes": {...}}`` when the device's
+        state at *since* is still in the history, else ``{"version": v,
+        "status": {...}}`` with the full status.
+        """
+        out: Dict[str, dict] = {}
+        for device, snap in self._snapshots.items():
+            version = self._versions[device]
+            if since is not None and version <= since:
+                continue
+            base = self._at(device, since) if since is not None else None
+            if base is None:
+                out[device] = {"version": version, "status": snap}
+            else:
+                out[device] = {"version": version, "changes": diff_status(base, snap)}
+        return out
+
+    def _at(self, device: str, version: int) -> Optional[Dict[str, object]]:
+        """The snapshot *device* had at *version*, if still remembered."""
+        for v, snap in reversed(self._history.get(device, ())):
+            if v <= version:
+                return snap
+        return None
+
+    async def wait_changed(self, since: int, timeout: Optional[float] = None) -> bool:
+        """Wait until :attr:`version` exceeds *since*; ``False`` on timeout."""
+        if self._changed is None:
+            raise RuntimeError("StatusHub.start() has not been called")
+        if self.version > since:
+            return True
+        try:
+            await asyncio.wait_for(self._changed.wait(), timeout)
+        except asyncio.TimeoutError:
+            return False
+        return self.version > since
+
+    async def wait_device(self, device: str, seen: int, timeout: Optional[float] = None) -> bool:
+        """Wait until *device* moves past version *seen* (or is closed)."""
+        loop = asyncio.get_running_loop()
+        deadline = None if timeout is None else loop.time() + timeout
+        while self._versions.get(device, -1) == seen:
+            remaining = None if deadline is None else deadline - loop.time()
+            if remaining is not None and remaining <= 0:
+                return False
+            await self.wait_changed(self.version, remaining)
+        return True
+
+    # ─── sampling ─────────────────────────────────────────────────────────
+    def sample(self) -> bool:
+        """Copy every cube's status once; return ``True`` if anything changed."""
+        changed = False
+        seen = set()
+        for device, ctrl in self.registry.items():
+            seen.add(device)
+            try:
+                snap = dict(ctrl.status)
+            except Exception as e:                     # cube vanished mid‑read
+                log.debug("Status sample of %s failed: %s", device, e)
+                continue
+            if self._snapshots.get(device) != snap:
+                self.version += 1
+                self._snapshots[device] = snap
+                self._versions[device] = self.version
+                self._history.setdefault(device, deque(maxlen=self.history)).append((self.version, snap))
+                changed = True
+        for device in set(self._snapshots) - seen:     # closed cubes
+            del self._snapshots[device], self._versions[device]
+            self._history.pop(device, None)
+            self.version += 1
+            changed = True
+        if changed and self._changed is not None:
+            self._changed.set()                        # wake current waiters …
+            self._changed = asyncio.Event()            # … and arm the next round
+        return changed
+
+    async def _run(self) -> None:
+        while True:
+            self.sample()
+            await asyncio.sleep(self.interval)
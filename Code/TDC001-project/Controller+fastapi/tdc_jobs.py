@@ -0,0 +1,210 @@
+"""tdc_jobs.py – fire‑and‑forget motion jobs for the FastAPI backend.
+
+The plain motion routes (``/move_rel``, ``/home`` …) keep the HTTP request
+open for the whole move.  A job instead returns an id at once and runs the
+move as an asyncio task through :class:`~tdc001.AsyncTDCController`, so a
+hundred in‑flight moves cost a hundred cheap coroutines, not a hundred threads.
+
+Lifecycle: ``queued`` → ``running`` → ``done`` | ``failed`` | ``cancelled``.
+Jobs on the same cube run one after another; jobs on different cubes run in
+parallel.
+
+A ``sequence`` job runs a whole list of moves / dwells (optionally repeated)
+on the server, so a scripted scan costs one HTTP request instead of one per
+step and a network hiccup cannot stall it half way.
+"""
+from __future__ import annotations
+
+import asyncio
+import itertools
+import logging
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional
+
+from tdc001 import AsyncTDCController
+
+__all__ = ["Job", "JobManager"]
+
+log = logging.getLogger("tdc-server")
+
+ACTIONS = ("move_relative", "move_absolute", "home", "sequence")
+STEP_ACTIONS = ("move_relative", "move_absolute", "home", "dwell")
+
+
+@dataclass
+class Job:
+    """One motion request and everything a client may want to know about it."""
+
+    id: str
+    device: str
+    action: str
+    params: Dict[str, Any]
+    state: str = "queued"
+    progress: float = 0.0                              # 0 … 1
+    result: Optional[Dict[str, Any]] = None
+    error: Optional[str] = None
+    created: float = field(default_factory=time.time)
+    started: Optional[float] = None
+    finished: Optional[float] = None
+    task: Optional[asyncio.Task] = field(default=None, repr=False)
+    probe: Optional[Callable[[], float]] = field(default=None, repr=False)  # live progress
+
+    @property
+    def done(self) -> bool:
+        return self.state in ("done", "failed", "cancelled")
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "id": self.id,
+            "device": self.device,
+            "action": self.action,
+            "params": self.params,
+            "state": self.state,
+            "progress": round(self.probe() if self.probe and not self.done else self.progress, 4),
+            "result": self.result,
+            "error": self.error,
+            "created": self.created,
+            "started": self.started,
+            "finished": self.finished,
+        }
+
+
+class JobManager:
+    """Create, run, track and cancel :class:`Job`\\ s.
+
+    All public methods must be called from the event loop thread (i.e. from
+    ``async def`` endpoints).  Only the last *keep* finished jobs are kept.
+    """
+
+    def __init__(self, *, keep: int = 500) -> None:
+        self._jobs: "OrderedDict[str, Job]" = OrderedDict()
+        self._locks: Dict[str, asyncio.Lock] = {}      # one queue per cube
+        self._ids = itertools.count(1)
+        self.keep = keep
+
+    # ─── public API ───────────────────────────────────────────────────────
+    def submit(self, device: str, ctrl: AsyncTDCController, action: str, **params) -> Job:
+        """Queue *action* on *ctrl* and return immediately."""
+        if action not in ACTIONS:
+            raise ValueError(f"Unknown action '{action}'. Expected one of {ACTIONS}.")
+        job = Job(id=f"{next(self._ids):06d}", device=device, action=action, params=params)
+        self._jobs[job.id] = job
+        job.task = asyncio.get_running_loop().create_task(self._run(job, ctrl))
+        self._prune()
+        return job
+
+    def get(self, job_id: str) -> Job:
+        return self._jobs[job_id]                      # KeyError → 404 in the server
+
+    def list(self) -> List[Job]:
+        return list(self._jobs.values())
+
+    async def wait(self, job_id: str, timeout: Optional[float] = None) -> Job:
+        """Wait (without a thread) until the job finishes or *timeout* passes."""
+        job = self.get(job_id)
+        if not job.done and job.task is not None:
+            await asyncio.wait({job.task}, timeout=timeout)
+        return job
+
+    def cancel(self, job_id: str) -> Job:
+        job = self.get(job_id)
+        if not job.done and job.task is not None:
+            job.task.cancel()
+        return job
+
+    def cancel_all(self) -> None:
+        for job in self._jobs.values():
+            if not job.done and job.task is not None:
+                job.task.cancel()
+
+    # ─── runner ───────────────────────────────────────────────────────────
+    async def _run(self, job: Job, ctrl: AsyncTDCController) -> None:
+        lock = self._locks.setdefault(job.device, asyncio.Lock())
+        try:
+            async with lock:
+                job.state, job.started = "running", time.time()
+                job.result = await self._execute(job, ctrl)
+                job.progress, job.state = 1.0, "done"
+        except asyncio.CancelledError:
+            if job.state == "running":
+                try:
+                    await ctrl.stop()                  # don't leave the stage running
+                except Exception as e:
+                    log.error("Stop after cancelling job %s failed: %s", job.id, e)
+            job.state = "cancelled"
+        except Exception as e:
+            job.state, job.error = "failed", str(e) or type(e).__name__
+        finally:
+            if job.probe is not None and job.state != "done":
+                job.progress = job.probe()             # freeze where it stopped
+            job.finished = time.time()
+
+    async def _execute(self, job: Job, ctrl: AsyncTDCController) -> Dict[str, Any]:
+        if job.action == "sequence":
+            return await self._execute_sequence(job, ctrl)
+        if job.action == "home":
+            await ctrl.home()
+            return {"status": "homed"}
+
+        start = ctrl.status["position"]
+        target = start + job.params["steps"] if job.action == "move_relative" else job.params["position"]
+
+        def progress() -> float:
+            span = target - start
+            pos = ctrl.status["position"]
+            return 1.0 if span == 0 else min(max((pos - start) / span, 0.0), 1.0)
+
+        job.probe = progress
+        if job.action == "move_relative":
+            await ctrl.move_relative(job.params["steps"])
+        else:
+            await ctrl.move_absolute(target)
+        return {"status": "moved", "position": ctrl.status["position"], **job.params}
+
+    async def _execute_sequence(self, job: Job, ctrl: AsyncTDCController) -> Dict[str, Any]:
+        """Run ``params["steps"]`` ``params["repeat"]`` times, back to back.
+
+        Each step is ``{"action": ..., "steps"/"position": ..., "dwell": s,
+        "repeat": n}``; *dwell* is a pause after the step (or the whole step
+        for ``action="dwell"``).  ``job.result`` shows the live step count.
+        """
+        steps, repeat = job.params["steps"], job.params.get("repeat", 1)
+        total = repeat * sum(step.get("repeat", 1) for step in steps)   # never expanded in memory
+        state = {"done": 0, "start": 0, "target": 0}
+
+        def progress() -> float:
+            span = state["target"] - state["start"]
+            frac = 0.0 if span == 0 else (ctrl.status["position"] - state["start"]) / span
+            return min((state["done"] + min(max(frac, 0.0), 1.0)) / total, 1.0) if total else 1.0
+
+        job.probe = progress
+        for _ in range(repeat):
+            for step in steps:
+                for _ in range(step.get("repeat", 1)):
+                    job.result = {"completed_steps": state["done"], "total_steps": total}
+                    await self._sequence_step(ctrl, step, state)
+                    state["done"] += 1
+        return {"status": "completed", "completed_steps": total, "total_steps": total,
+                "position": ctrl.status["position"]}
+
+    @staticmethod
+    async def _sequence_step(ctrl: AsyncTDCController, step: Dict[str, Any], state: Dict[str, int]) -> None:
+        action = step["action"]
+        state["start"] = state["target"] = ctrl.status["position"]
+        if action == "move_relative":
+            state["target"] = state["start"] + step["steps"]
+            await ctrl.move_relative(step["steps"])
+        elif action == "move_absolute":
+            state["target"] = step["position"]
+            await ctrl.move_absolute(step["position"])
+        elif action == "home":
+            await ctrl.home()
+        if step.get("dwell"):
+            await asyncio.sleep(step["dwell"])
+
+    def _prune(self) -> None:
+        finished = [j.id for j in self._jobs.values() if j.done]
+        for job_id in finished[: max(0, len(finished) - self.keep)]:
+            del self._jobs[job_id]
@@ -0,0 +1,106 @@
+"""tdc_jog.py – hold‑to‑move: continuous velocity motion guarded by a deadman.
+
+While a "move" button is held the client keeps one ``/ws/jog`` connection
+open and sends::
+
+    {"type": "jog", "direction": "forward", "velocity": 20000}   start, or change direction / speed
+    {"type": "heartbeat"}                                          still holding – every ~100 ms
+    {"type": "stop"}                                               button released
+
+:class:`JogSession` drives the cube with :meth:`tdc001.TDCController.jog`, so
+motion starts with one serial command and speed changes take effect at once
+instead of waiting for a move to finish.  If nothing arrives for ``deadman``
+seconds – frozen GUI, dropped Wi‑Fi, crashed client – or the connection
+closes, the cube is stopped (profiled ramp‑down) and the client is told
+``{"type": "stopped", "reason": "deadman"}`` if it is still listening.
+"""
+from __future__ import annotations
+
+import asyncio
+import logging
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+from tdc001 import AsyncTDCController
+
+__all__ = ["JogSession"]
+
+log = logging.getLogger("tdc-server")
+
+
+class JogSession:
+    """One client's jog of one cube (see module docstring)."""
+
+    def __init__(self, ctrl: AsyncTDCController, *, deadman: float = 0.5,
+                 notify: Optional[Callable[[Dict[str, Any]], Awaitable[None]]] = None) -> None:
+        self.ctrl = ctrl
+        self.deadman = deadman
+        self.notify = notify                           # tells the client about a deadman stop
+        self.direction: Optional[str] = None           # None → not jogging
+        self.velocity: Optional[float] = None
+        self._last = 0.0                               # loop time of the last message
+        self._watchdog: Optional[asyncio.Task] = None
+
+    @property
+    def jogging(self) -> bool:
+        return self.direction is not None
+
+    # ─── client messages ──────────────────────────────────────────────────
+    async def handle(self, msg: Any) -> Optional[Dict[str, Any]]:
+        """Apply one message; return the reply for the client (``None`` → none).
+
+        Every message counts as a heartbeat.  Bad messages raise
+        :class:`ValueError`.
+        """
+        if not isinstance(msg, dict):
+            raise ValueError("Messages must be JSON objects.")
+        self._last = asyncio.get_running_loop().time()
+        kind = msg.get("type", "heartbeat")
+        if kind == "heartbeat":
+            return None
+        if kind == "jog":
+            direction = msg.get("direction", self.direction or "forward")
+            velocity = msg.get("velocity", self.velocity)
+            if velocity is not None and (isinstance(velocity, bool) or not isinstance(velocity, (int, float))):
+                raise ValueError("velocity must be a number (counts/s).")
+            await self.ctrl.jog(direction, velocity)
+            self.direction, self.velocity = direction, velocity
+            if self._watchdog is None or self._watchdog.done():
+                self._watchdog = asyncio.get_running_loop().create_task(self._watch())
+            return {"type": "jogging", "direction": direction, "velocity": velocity}
+        if kind == "stop":
+            await self.stop()
+            return {"type": "stopped", "reason": "client"}
+        raise ValueError(f"Unknown message type {kind!r}.")
+
+    async def stop(self) -> None:
+        """End the jog (no‑op if not jogging)."""
+        if self._watchdog is not None and self._watchdog is not asyncio.current_task():
+            self._watchdog.cancel()
+        self._watchdog = None
+        if self.direction is None:
+            return
+        self.direction = None
+        try:
+            await self.ctrl.stop(immediate=False)
+        except Exception as e:
+            log.error("Stopping jog on %s failed: %s", self.ctrl.serial_port, e)
+
+    async def close(self) -> None:
+        """The connection is gone – make sure nothing keeps moving."""
+        await self.stop()
+
+    # ─── deadman ──────────────────────────────────────────────────────────
+    async def _watch(self) -> None:
+        loop = asyncio.get_running_loop()
+        while self.direction is not None:
+            remaining = self._last + self.deadman - loop.time()
+            if remaining > 0:
+                await asyncio.sleep(remaining)
+                continue
+            log.warning("Jog on %s: no heartbeat for %.2f s – stopping.", self.ctrl.serial_port, self.deadman)
+            await self.stop()
+            if self.notify is not None:
+                try:
+                    await self.notify({"type": "stopped", "reason": "deadman"})
+                except Exception:                      # client already gone
+                    pass
@@ -0,0 +1,256 @@
+#!/usr/bin/env python3
+"""tdc_loadtest.py – hammer ``tdc_server`` with many concurrent clients.
+
+Our lab runs many GUIs and scripts against one backend.  This script plays
+all of them at once: *N* clients fire a weighted mix of ``/status``,
+``/move_rel``, ``/stop`` and ``/ports`` requests for a fixed time, while
+*M* extra "movers" keep long moves in flight during the middle third of the
+run.  Every request is tagged with whether such a long move was running when
+it was sent, so the report shows how ``/status`` and ``/stop`` latency
+degrade during motion::
+
+    python tdc_loadtest.py                          # 20 clients, 1 mover, 15 s, loopback
+    python tdc_loadtest.py --mode inprocess         # no sockets: ASGI calls in this process
+    python tdc_loadtest.py --url http://lab-pc:8000 --clients 50 --out load.json
+
+``loopback`` (default) starts uvicorn on 127.0.0.1 in this process and uses
+a simulated cube (``sim:1``, see ``tdc_sim.py``).  ``inprocess`` skips the
+network entirely to isolate the app's own cost.  ``--url`` targets a server
+that is already running (real or simulated cubes).
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import random
+import socket
+import sys
+import threading
+import time
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+
+import httpx
+
+from tdc_bench import summarize
+
+DEFAULT_MIX = "status=70,move_rel=10,stop=5,ports=5"
+
+ROUTES = {                                            # name → (method, path, body)
+    "status": ("GET", "/status", None),
+    "move_rel": ("POST", "/move_rel", None),          # body built per request
+    "stop": ("POST", "/stop", None),
+    "ports": ("GET", "/ports", None),
+}
+
+
+@dataclass
+class Sample:
+    route: str
+    seconds: float
+    ok: bool
+    moving: bool                                      # a long move was in flight when sent
+    error: Optional[str] = None
+
+
+class Load:
+    """Shared state of one run: samples and the number of long moves in flight."""
+
+    def __init__(self, steps: int, long_steps: int) -> None:
+        self.samples: List[Sample] = []
+        self.long_in_flight = 0
+        self.steps = steps
+        self.long_steps = long_steps
+        self.sign = 1
+
+    async def call(self, client: httpx.AsyncClient, route: str, *, long: bool = False) -> None:
+        method, path, body = ROUTES[route]
+        if route == "move_rel":
+            self.sign = -self.sign                    # wander back and forth
+            body = {"steps": self.sign * (self.long_steps if long else self.steps)}
+        moving = self.long_in_flight > 0
+        if long:
+            self.long_in_flight += 1
+        t0 = time.perf_counter()
+        try:
+            r = await client.request(method, path, json=body, timeout=150)
+            ok, error = r.status_code < 400, None if r.status_code < 400 else f"HTTP {r.status_code}"
+        except httpx.HTTPError as e:
+            ok, error = False, type(e).__name__
+        finally:
+            if long:
+                self.long_in_flight -= 1
+        self.samples.append(Sample(route, time.perf_counter() - t0, ok, moving or long, error))
+
+
+# ───────────── clients ─────────────
+
+async def client_loop(load: Load, client: httpx.AsyncClient, mix: List[Tuple[str, int]],
+                      until: float, think: float) -> None:
+    routes, weights = zip(*mix)
+    while time.monotonic() < until:
+        await load.call(client, random.choices(routes, weights)[0])
+        if think:
+            await asyncio.sleep(random.uniform(0, 2 * think))
+
+
+async def mover_loop(load: Load, client: httpx.AsyncClient, start: float, until: float) -> None:
+    await asyncio.sleep(max(0.0, start - time.monotonic()))
+    while time.monotonic() < until:
+        await load.call(client, "move_rel", long=True)
+
+
+async def drive(base: str, *, clients: int, movers: int, duration: float, mix: List[Tuple[str, int]],
+                think: float, steps: int, long_steps: int,
+                transport: Optional[httpx.AsyncBaseTransport] = None) -> Tuple[Load, float]:
+    load = Load(steps, long_steps)
+    limits = httpx.Limits(max_connections=clients + movers + 1)
+    async with httpx.AsyncClient(base_url=base, transport=transport, limits=limits) as client:
+        now = time.monotonic()
+        until = now + duration
+        t0 = time.perf_counter()
+        await asyncio.gather(                         # idle → moving → idle
+            *(mover_loop(load, client, now + duration / 3, now + 2 * duration / 3) for _ in range(movers)),
+            *(client_loop(load, client, mix, until, think) for _ in range(clients)),
+        )
+        elapsed = time.perf_counter() - t0
+        try:
+            await client.post("/stop", timeout=5)     # leave the stage at rest
+        except httpx.HTTPError:
+            pass
+    return load, elapsed
+
+
+# ───────────── server modes ─────────────
+
+async def run_inprocess(**kw) -> Tuple[Load, float]:
+    """Call the ASGI app directly; startup/shutdown hooks are run by hand."""
+    import tdc_server
+    await tdc_server.app.router.startup()
+    try:
+        return await drive("http://tdc", transport=httpx.ASGITransport(app=tdc_server.app), **kw)
+    finally:
+        await tdc_server.app.router.shutdown()
+
+
+def run_loopback(**kw) -> Tuple[Load, float]:
+    """Serve the app with uvicorn on a free 127.0.0.1 port (own thread + loop)."""
+    import uvicorn
+    import tdc_server
+
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        port = s.getsockname()[1]
+    server = uvicorn.Server(uvicorn.Config(tdc_server.app, host="127.0.0.1", port=port,
+                                           log_level="warning"))
+    thread = threading.Thread(target=server.run, daemon=True)
+    thread.start()
+    try:
+        deadline = time.monotonic() + 15
+        while not server.started:
+            if time.monotonic() > deadline or not thread.is_alive():
+                raise RuntimeError("uvicorn did not start")
+            time.sleep(0.02)
+        return asyncio.run(drive(f"http://127.0.0.1:{port}", **kw))
+    finally:
+        server.should_exit = True
+        thread.join(timeout=15)
+
+
+# ───────────── report ─────────────
+
+def summarize_load(load: Load, elapsed: float) -> Dict[str, dict]:
+    """Per ``route.phase`` (phase = idle | moving) counts, error rate and latency."""
+    groups: Dict[str, List[Sample]] = {}
+    for s in load.samples:
+        groups.setdefault(f"{s.route}.{'moving' if s.moving else 'idle'}", []).append(s)
+    out: Dict[str, dict] = {}
+    for name, samples in sorted(groups.items()):
+        errors = [s for s in samples if not s.ok]
+        out[name] = {
+            **summarize([s.seconds for s in samples]),
+            "rps": round(len(samples) / elapsed, 2),
+            "errors": len(errors),
+            "error_rate": round(len(errors) / len(samples), 4),
+            "error_kinds": sorted({s.error for s in errors if s.error}),
+        }
+    return out
+
+
+def report(results: dict) -> str:
+    t = results["totals"]
+    lines = [
+        f"{t['requests']} requests in {t['seconds']:.1f} s → {t['rps']:.1f} req/s, "
+        f"{t['errors']} errors ({100 * t['error_rate']:.2f} %)",
+        f"{'route.phase':<20}{'n':>7}{'rps':>9}{'err%':>7}{'p50':>10}{'p95':>10}{'p99':>10}{'max':>10}   (ms)",
+    ]
+    for name, r in results["routes"].items():
+        lines.append(f"{name:<20}{r['n']:>7}{r['rps']:>9.1f}{100 * r['error_rate']:>7.2f}"
+                     f"{r['p50']:>10.2f}{r['p95']:>10.2f}{r['p99']:>10.2f}{r['max']:>10.2f}")
+    return "\n".join(lines)
+
+
+def parse_mix(text: str) -> List[Tuple[str, int]]:
+    mix = []
+    for part in text.split(","):
+        name, _, weight = part.partition("=")
+        if name.strip() not in ROUTES:
+            raise argparse.ArgumentTypeError(f"Unknown route '{name}'. Expected one of {list(ROUTES)}.")
+        mix.append((name.strip(), int(weight or 1)))
+    return mix
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    p = argparse.ArgumentParser(description="Concurrent HTTP load test for tdc_server")
+    p.add_argument("--mode", choices=("loopback", "inprocess"), default="loopback")
+    p.add_argument("--url", help="test a running server instead (overrides --mode)")
+    p.add_argument("--clients", type=int, default=20, help="concurrent mixed‑traffic clients (default: 20)")
+    p.add_argument("--movers", type=int, default=1, help="clients that keep long moves running (default: 1)")
+    p.add_argument("--duration", type=float, default=15.0, help="seconds (default: 15)")
+    p.add_argument("--mix", type=parse_mix, default=parse_mix(DEFAULT_MIX),
+                   help=f"route weights (default: {DEFAULT_MIX})")
+    p.add_argument("--think", type=float, default=0.05, help="mean pause between a client's requests, s")
+    p.add_argument("--steps", type=int, default=2000, help="counts per mixed‑traffic move")
+    p.add_argument("--long-steps", type=int, default=100_000, help="counts per mover move")
+    p.add_argument("--sims", type=int, default=1, help="simulated cubes for local modes (default: 1)")
+    p.add_argument("--out", help="write results as JSON to this file")
+    args = p.parse_args(argv)
+
+    logging.getLogger("httpx").setLevel(logging.WARNING)  # one INFO line per request otherwise
+    if not args.url:
+        os.environ.setdefault("TDC_SIMULATE", str(args.sims))
+    kw = dict(clients=args.clients, movers=args.movers, duration=args.duration, mix=args.mix,
+              think=args.think, steps=args.steps, long_steps=args.long_steps)
+    if args.url:
+        mode = args.url
+        load, elapsed = asyncio.run(drive(args.url, **kw))
+    elif args.mode == "inprocess":
+        mode = "inprocess"
+        load, elapsed = asyncio.run(run_inprocess(**kw))
+    else:
+        mode = "loopback"
+        load, elapsed = run_loopback(**kw)
+
+    errors = sum(not s.ok for s in load.samples)
+    total = len(load.samples)
+    results = {
+        "meta": {"created": time.strftime("%Y-%m-%dT%H:%M:%S%z"), "target": mode,
+                 **{k: v for k, v in kw.items() if k != "mix"}, "mix": dict(args.mix)},
+        "totals": {"requests": total, "seconds": round(elapsed, 3),
+                   "rps": round(total / elapsed, 2) if elapsed else 0.0,
+                   "errors": errors, "error_rate": round(errors / total, 4) if total else 0.0},
+        "routes": summarize_load(load, elapsed),
+    }
+    print(report(results))
+    if args.out:
+        with open(args.out, "w") as f:
+            json.dump(results, f, indent=2)
+        print(f"Results written to {args.out}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,216 @@
+"""tdc_metrics.py – Prometheus text‑format metrics for ``tdc_server``.
+
+``GET /metrics`` answers in the plain‑text exposition format (0.0.4) that
+Prometheus, VictoriaMetrics, Grafana Agent … scrape.  Nothing extra to
+install: the three metric kinds needed here (:class:`Counter`,
+:class:`Gauge`, :class:`Histogram`) are a few lines each.
+
+What is measured:
+
+* every HTTP request – count and latency per route template and status
+  (:class:`RequestMetrics`, a plain ASGI middleware),
+* serial status‑poll round trips, time spent in ``_wait_until``, move
+  durations and device errors – via :class:`tdc001.Instrumentation`
+  (:class:`ControllerMetrics`),
+* gauges read at scrape time: open cubes, jobs per state, busy worker
+  threads, event‑loop tasks, recorder backlog.
+"""
+from __future__ import annotations
+
+import math
+import threading
+import time
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from tdc001 import Instrumentation, TDCController
+
+__all__ = [
+    "CONTENT_TYPE", "Counter", "Gauge", "Histogram", "MetricsRegistry",
+    "ControllerMetrics", "RequestMetrics",
+]
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120)
+RTT_BUCKETS = (0.001, 0.002, 0.004, 0.008, 0.016, 0.032, 0.064, 0.128, 0.256, 0.512, 1)
+MOVE_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 20, 30, 60, 120, 300)
+
+Labels = Tuple[str, ...]
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    parts = [f'{n}="{_escape(str(v))}"' for n, v in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _num(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+# ─── metric kinds ─────────────────────────────────────────────────────────
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, help: str, labels: Sequence[str] = ()) -> None:
+        self.name, self.help, self.labelnames = name, help, tuple(labels)
+        self._lock = threading.Lock()                  # observations come from driver threads too
+
+    def render(self) -> Iterable[str]:
+        yield f"# HELP {self.name} {self.help}"
+        yield f"# TYPE {self.name} {self.kind}"
+        yield from self._samples()
+
+    def _samples(self) -> Iterable[str]:
+        raise NotImplementedError
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def __init__(self, *args, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        self._values: Dict[Labels, float] = {}
+
+    def inc(self, *labels: str, amount: float = 1.0) -> None:
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0.0) + amount
+
+    def _samples(self) -> Iterable[str]:
+        with self._lock:
+            items = sorted(self._values.items())
+        for labels, value in items:
+            yield f"{self.name}{_labels(self.labelnames, labels)} {_num(value)}"
+
+
+class Gauge(_Metric):
+    """Read at scrape time from *collect*, which returns ``[(labels, value), …]``."""
+
+    kind = "gauge"
+
+    def __init__(self, name: str, help: str, labels: Sequence[str] = (),
+                 collect: Optional[Callable[[], Iterable[Tuple[Labels, float]]]] = None) -> None:
+        super().__init__(name, help, labels)
+        self.collect = collect or (lambda: ())
+
+    def _samples(self) -> Iterable[str]:
+        for labels, value in self.collect():
+            yield f"{self.name}{_labels(self.labelnames, labels)} {_num(value)}"
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, help: str, labels: Sequence[str] = (),
+                 buckets: Sequence[float] = LATENCY_BUCKETS) -> None:
+        super().__init__(name, help, labels)
+        self.buckets = tuple(sorted(buckets))
+        self._series: Dict[Labels, List[float]] = {}  # per bucket counts …, +Inf count, sum
+
+    def observe(self, value: float, *labels: str) -> None:
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                series = self._series[labels] = [0.0] * (len(self.buckets) + 2)
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[i] += 1
+                    break
+            else:
+                series[len(self.buckets)] += 1
+            series[-1] += value
+
+    def _samples(self) -> Iterable[str]:
+        with self._lock:
+            items = sorted((k, list(v)) for k, v in self._series.items())
+        for labels, series in items:
+            total = 0.0
+            for bound, n in zip(self.buckets + (math.inf,), series):
+                total += n                             # exposition wants cumulative counts
+                le = 'le="%s"' % _num(bound)
+                yield f"{self.name}_bucket{_labels(self.labelnames, labels, le)} {_num(total)}"
+            yield f"{self.name}_sum{_labels(self.labelnames, labels)} {_num(series[-1])}"
+            yield f"{self.name}_count{_labels(self.labelnames, labels)} {_num(total)}"
+
+
+class MetricsRegistry:
+    """An ordered set of metrics rendered together."""
+
+    def __init__(self) -> None:
+        self.metrics: List[_Metric] = []
+
+    def add(self, metric: _Metric) -> _Metric:
+        self.metrics.append(metric)
+        return metric
+
+    def render(self) -> str:
+        lines: List[str] = []
+        for metric in self.metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+# ─── request timing (ASGI middleware) ─────────────────────────────────────
+class RequestMetrics:
+    """Count and time HTTP requests per route *template* (``/jobs/{job_id}``)."""
+
+    def __init__(self, app, *, requests: Counter, latency: Histogram) -> None:
+        self.app, self.requests, self.latency = app, requests, latency
+
+    async def __call__(self, scope, receive, send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        status = [500]
+
+        async def send_wrapper(message) -> None:
+            if message["type"] == "http.response.start":
+                status[0] = message["status"]
+            await send(message)
+
+        t0 = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            route = scope.get("route")                 # set by FastAPI's router on a match
+            path = getattr(route, "path", None) or "unmatched"
+            self.latency.observe(time.perf_counter() - t0, scope["method"], path)
+            self.requests.inc(scope["method"], path, str(status[0]))
+
+
+# ─── controller timings ───────────────────────────────────────────────────
+class ControllerMetrics(Instrumentation):
+    """Feed :class:`tdc001.TDCController` timings into histograms/counters."""
+
+    def __init__(self, registry: MetricsRegistry, device_of: Callable[[TDCController], str]) -> None:
+        self.device_of = device_of
+        self.rtt = registry.add(Histogram(
+            "tdc_serial_rtt_seconds", "Status request to status reply over the serial link.",
+            ("device",), RTT_BUCKETS))
+        self.wait = registry.add(Histogram(
+            "tdc_wait_seconds", "Time spent waiting for a cube condition (_wait_until).",
+            ("device",), MOVE_BUCKETS))
+        self.move = registry.add(Histogram(
+            "tdc_move_duration_seconds", "Command sent to completion detected.",
+            ("device", "action"), MOVE_BUCKETS))
+        self.errors = registry.add(Counter(
+            "tdc_device_errors_total", "Errors reported by the cube.", ("device", "code")))
+
+    def serial_rtt(self, ctrl, seconds) -> None:
+        self.rtt.observe(seconds, self.device_of(ctrl))
+
+    def waited(self, ctrl, seconds) -> None:
+        self.wait.observe(seconds, self.device_of(ctrl))
+
+    def move_done(self, ctrl, action, seconds) -> None:
+        self.move.observe(seconds, self.device_of(ctrl), action)
+
+    def device_error(self, ctrl, code, notes) -> None:
+        self.errors.inc(self.device_of(ctrl), str(code))
@@ -0,0 +1,256 @@
+"""tdc_recorder.py – full position‑vs‑time history for overnight runs.
+
+:class:`Recorder` receives every telemetry sample (see ``tdc_telemetry.py``)
+and appends it to per‑device binary log files::
+
+    <TDC_RECORD_DIR>/<device>/20250612-221500-0003.tdcrec
+    <TDC_RECORD_DIR>/<device>/index.json
+
+Each ``.tdcrec`` segment is a 64‑byte :data:`HEADER` followed by fixed
+:data:`~tdc_telemetry.RECORD` samples (the same 24‑byte layout ``/telemetry``
+serves), so a segment can be memory‑mapped as one NumPy structured array.  A
+segment is preallocated to ``max_bytes`` and written through ``mmap``; it is
+closed (and trimmed) when full or ``max_seconds`` old, and the next one
+starts.  ``index.json`` lists every segment's first/last time and record
+count for time‑range lookups; the header's ``count`` tells readers how much
+of the open segment is valid.  Sample times are wall‑clock, so a clock step
+(NTP, DST on a badly set box) can make them go backwards: the segment is
+then flagged :data:`FLAG_UNSORTED` and its index entry carries the real
+``t_min``/``t_max``, and :func:`read_range` filters it instead of bisecting.
+
+Writing never blocks the status or motion path: :meth:`Recorder.push` only
+appends to a bounded deque (the oldest samples are dropped – and counted – if
+the disk cannot keep up) and a background thread does all file work.
+
+Reading needs NumPy::
+
+    from tdc_recorder import read_range
+    for seg in read_range("/data/tdc", "83812345", start=t0, end=t1):
+        plot(seg["t"], seg["position"])      # memory‑mapped views, no copy (unless unsorted)
+
+Recording is on when ``TDC_RECORD_DIR`` is set; ``TDC_RECORD_MAX_MB``
+(default 64) and ``TDC_RECORD_MAX_SECONDS`` (default 3600) control rotation.
+"""
+from __future__ import annotations
+
+import collections
+import json
+import logging
+import mmap
+import os
+import re
+import struct
+import threading
+import time
+from pathlib import Path
+from typing import Deque, Dict, List, Optional, Tuple
+
+from tdc_telemetry import DTYPE, RECORD
+
+__all__ = ["FLAG_UNSORTED", "HEADER", "MAGIC", "Recorder", "load_index", "read_range"]
+
+log = logging.getLogger("tdc-server")
+
+MAGIC = b"TDCREC\x00\x01"
+HEADER = struct.Struct("<8sHHIdQ32s")                 # magic, version, record size, flags, t_start, count, device
+FLAGS_OFFSET = 12                                     # byte offset of ``flags`` inside HEADER
+COUNT_OFFSET = 24                                     # byte offset of ``count`` inside HEADER
+FLAG_UNSORTED = 1                                     # some sample is older than the one before it
+INDEX_NAME = "index.json"
+SUFFIX = ".tdcrec"
+
+
+def _device_dir(root: Path, device: str) -> Path:
+    return root / re.sub(r"[^\w.-]", "_", device)
+
+
+def load_index(directory: Path) -> List[dict]:
+    """Segments of one device directory, oldest first (``t_last`` is ``None`` while open)."""
+    try:
+        return json.loads((Path(directory) / INDEX_NAME).read_text())
+    except (FileNotFoundError, ValueError):
+        return []
+
+
+class _Segment:
+    """One preallocated, memory‑mapped log file."""
+
+    def __init__(self, path: Path, device: str, t_start: float, capacity: int) -> None:
+        self.path, self.t_start, self.capacity = path, t_start, capacity
+        self.count = 0
+        self.t_last = self.t_min = self.t_max = t_start
+        self.flags = 0
+        with open(path, "wb") as f:
+            f.truncate(HEADER.size + capacity * RECORD.size)
+        self._file = open(path, "r+b")
+        self._mm = mmap.mmap(self._file.fileno(), 0)
+        HEADER.pack_into(self._mm, 0, MAGIC, 1, RECORD.size, 0, t_start, 0,
+                         device.encode()[:32])
+
+    def append(self, record: tuple) -> None:
+        RECORD.pack_into(self._mm, HEADER.size + self.count * RECORD.size, *record)
+        t = record[0]
+        if t < self.t_last:                            # wall clock stepped back
+            self.flags |= FLAG_UNSORTED
+        self.count += 1
+        self.t_last = t
+        self.t_min, self.t_max = min(self.t_min, t), max(self.t_max, t)
+
+    def commit(self) -> None:
+        """Publish the records written so far to readers."""
+        struct.pack_into("<I", self._mm, FLAGS_OFFSET, self.flags)
+        struct.pack_into("<Q", self._mm, COUNT_OFFSET, self.count)
+
+    def close(self) -> None:
+        self.commit()
+        self._mm.flush()
+        self._mm.close()
+        self._file.truncate(HEADER.size + self.count * RECORD.size)   # drop unused tail
+        self._file.close()
+
+
+class Recorder:
+    """Log every pushed sample to rotating per‑device segment files."""
+
+    def __init__(self, directory: str | os.PathLike, *, max_bytes: int = 64 << 20,
+                 max_seconds: float = 3600.0, queue_size: int = 1_000_000,
+                 flush_interval: float = 0.5) -> None:
+        self.root = Path(directory)
+        self.capacity = max(1, (max_bytes - HEADER.size) // RECORD.size)
+        self.max_seconds = max_seconds
+        self.flush_interval = flush_interval
+        self.dropped = 0                               # samples lost to a full queue
+        self._queue: Deque[Tuple[str, tuple]] = collections.deque(maxlen=queue_size)
+        self._segments: Dict[str, _Segment] = {}
+        self._wake = threading.Event()
+        self._stopping = False
+        self._thread: Optional[threading.Thread] = None
+
+    # ─── lifecycle ────────────────────────────────────────────────────────
+    def start(self) -> None:
+        self.root.mkdir(parents=True, exist_ok=True)
+        self._stopping = False
+        self._thread = threading.Thread(target=self._run, name="tdc-recorder", daemon=True)
+        self._thread.start()
+        log.info("Recording telemetry to %s", self.root)
+
+    def stop(self) -> None:
+        """Write what is queued, close every segment and update the indexes."""
+        self._stopping = True
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join(timeout=30)
+            self._thread = None
+
+    @property
+    def backlog(self) -> int:
+        """Samples queued but not yet written."""
+        return len(self._queue)
+
+    def push(self, device: str, record: tuple) -> None:
+        """Queue one sample; never blocks (Telemetry listener)."""
+        if len(self._queue) == self._queue.maxlen:
+            self.dropped += 1
+        self._queue.append((device, record))
+
+    # ─── writer thread ────────────────────────────────────────────────────
+    def _run(self) -> None:
+        while not self._stopping:
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            self._drain()
+        self._drain()
+        for device in list(self._segments):
+            self._close(device)
+
+    def _drain(self) -> None:
+        touched = set()
+        while self._queue:
+            device, record = self._queue.popleft()
+            try:
+                seg = self._segments.get(device)
+                if seg is not None and (seg.count >= seg.capacity
+                                        or record[0] - seg.t_start >= self.max_seconds):
+                    self._close(device)
+                    seg = None
+                if seg is None:
+                    seg = self._open(device, record[0])
+                seg.append(record)
+                touched.add(device)
+            except OSError as e:                       # disk full, permissions, …
+                log.error("Telemetry recorder for %s failed: %s", device, e)
+        for device in touched:
+            if device in self._segments:
+                self._segments[device].commit()
+
+    def _open(self, device: str, t: float) -> _Segment:
+        directory = _device_dir(self.root, device)
+        directory.mkdir(parents=True, exist_ok=True)
+        index = load_index(directory)
+        name = f"{time.strftime('%Y%m%d-%H%M%S', time.localtime(t))}-{len(index):04d}{SUFFIX}"
+        seg = self._segments[device] = _Segment(directory / name, device, t, self.capacity)
+        index.append({"file": name, "t_first": t, "t_last": None, "count": 0})
+        self._write_index(directory, index)
+        return seg
+
+    def _close(self, device: str) -> None:
+        seg = self._segments.pop(device)
+        seg.close()
+        directory = seg.path.parent
+        index = load_index(directory)
+        for entry in index:
+            if entry["file"] == seg.path.name:
+                entry.update(t_last=seg.t_last, count=seg.count, t_min=seg.t_min, t_max=seg.t_max)
+        self._write_index(directory, index)
+
+    @staticmethod
+    def _write_index(directory: Path, index: List[dict]) -> None:
+        tmp = directory / (INDEX_NAME + ".tmp")
+        tmp.write_text(json.dumps(index, indent=1))
+        os.replace(tmp, directory / INDEX_NAME)       # readers never see half a file
+
+
+# ─── reader ───────────────────────────────────────────────────────────────
+def read_range(directory: str | os.PathLike, device: str, start: Optional[float] = None,
+               end: Optional[float] = None) -> list:
+    """Samples of *device* with start ≤ t < end, one read‑only memmap view per segment.
+
+    Nothing is copied, except for segments flagged :data:`FLAG_UNSORTED`,
+    which are filtered with a mask; ``numpy.concatenate`` the list if one
+    array is wanted.
+    """
+    import numpy as np
+
+    dtype = np.dtype(DTYPE)
+    out = []
+    dev_dir = _device_dir(Path(directory), device)
+    for entry in load_index(dev_dir):
+        if entry["t_last"] is not None:                # closed: real bounds known (open: read it)
+            if end is not None and entry.get("t_min", entry["t_first"]) >= end:
+                continue
+            if start is not None and entry.get("t_max", entry["t_last"]) < start:
+                continue
+        path = dev_dir / entry["file"]
+        try:
+            with open(path, "rb") as f:
+                magic, _, size, flags, _, count, _ = HEADER.unpack(f.read(HEADER.size))
+        except (FileNotFoundError, struct.error):
+            continue
+        if magic != MAGIC or size != dtype.itemsize or count == 0:
+            continue
+        arr = np.memmap(path, dtype=dtype, mode="r", offset=HEADER.size, shape=(count,))
+        t = arr["t"]
+        if flags & FLAG_UNSORTED:                      # bisecting would be silently wrong
+            keep = np.ones(count, bool)
+            if start is not None:
+                keep &= t >= start
+            if end is not None:
+                keep &= t < end
+            if keep.any():
+                out.append(arr[keep])
+            continue
+        lo = 0 if start is None else int(np.searchsorted(t, start, "left"))
+        hi = count if end is None else int(np.searchsorted(t, end, "left"))
+        if hi > lo:
+            out.append(arr[lo:hi])
+    return out
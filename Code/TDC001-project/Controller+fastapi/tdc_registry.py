@@ -0,0 +1,165 @@
+"""tdc_registry.py – keep *every* attached TDC001 cube open in one process.
+
+The original server owned a single module‑level controller, so a rig with a
+dozen cubes needed a dozen containers.  :class:`DeviceRegistry` instead holds
+one :class:`~tdc001.TDCController` per cube, keyed by the cube's serial number
+(e.g. ``"83812345"``).  Lookups also accept the serial‑port device
+(``"/dev/ttyUSB0"``) or just its basename (``"ttyUSB0"``) so URLs stay short.
+
+Each controller owns its own serial port and driver thread, so different cubes
+can move at the same time.  Every cube is also wrapped in an
+:class:`~tdc001.AsyncTDCController` for ``async def`` endpoints.
+"""
+from __future__ import annotations
+
+import logging
+import os
+import threading
+from typing import Dict, List, Optional
+
+from tdc001 import AsyncTDCController, TDCController, find_tdc001_devices
+
+__all__ = ["DeviceRegistry"]
+
+log = logging.getLogger("tdc-server")
+
+
+class DeviceRegistry:
+    """Serial‑number → :class:`TDCController` map with an *active* default cube.
+
+    The active cube is what the legacy single‑device routes (``/status``,
+    ``/move_rel`` …) talk to; it is the first cube opened unless ``/connect``
+    picks another one.
+    """
+
+    def __init__(self) -> None:
+        self._devices: Dict[str, TDCController] = {}
+        self._async: Dict[str, AsyncTDCController] = {}
+        self._lock = threading.RLock()               # guards _devices + active
+        self.active: Optional[str] = None
+
+    # ─── opening / closing ────────────────────────────────────────────────
+    def open_all(self) -> List[str]:
+        """Open every cube reported by :func:`find_tdc001_devices`.
+
+        A cube that fails to open is logged and skipped so one bad USB link
+        does not take the whole rack down.  Returns the ids now registered.
+        """
+        for serial, port in find_tdc001_devices().items():
+            try:
+                self.open(port, serial=serial)
+            except Exception as e:
+                log.error("Could not open TDC001 %s on %s: %s", serial, port, e)
+        return self.ids()
+
+    def open(self, port: str, *, serial: Optional[str] = None) -> str:
+        """Open *port* (or return the id it is already registered under).
+
+        Enumerating ports and opening the cube take a while, so they run
+        without the lock – lookups from the event loop never wait for them.
+        If another thread registered the same cube meanwhile, ours is closed.
+        """
+        with self._lock:
+            existing = self._resolve(port)
+        if existing is not None:
+            return existing
+        if serial is None:
+            serial = self._serial_for(port)
+        ctrl = TDCController(serial_port=port)
+        with self._lock:
+            existing = serial if serial in self._devices else self._resolve(port)
+            if existing is None:
+                self._devices[serial] = ctrl
+                self._async[serial] = AsyncTDCController(ctrl)
+                if self.active is None:
+                    self.active = serial
+        if existing is not None:                     # lost the race – keep the first handle
+            ctrl.close(stop=False)                   # don't stop a cube the winner may be moving
+            return existing
+        log.info("Connected to TDC001 %s on %s", serial, port)
+        return serial
+
+    def close(self, device_id: str) -> None:
+        """Close and forget one cube; unknown ids raise :class:`KeyError`."""
+        with self._lock:
+            key = self._resolve(device_id)
+            if key is None:
+                raise KeyError(device_id)
+            ctrl = self._devices.pop(key)
+            self._async.pop(key)._detach()
+            if self.active == key:
+                self.active = next(iter(self._devices), None)
+        ctrl.close()
+        log.info("TDC001 %s connection closed.", key)
+
+    def close_all(self) -> None:
+        for key in self.ids():
+            self.close(key)
+
+    # ─── lookup ───────────────────────────────────────────────────────────
+    def get(self, device_id: Optional[str] = None) -> TDCController:
+        """Return the controller for *device_id* (``None`` → active cube)."""
+        with self._lock:
+            key = self.active if device_id is None else self._resolve(device_id)
+            if key is None:
+                raise KeyError(device_id)
+            return self._devices[key]
+
+    def get_async(self, device_id: Optional[str] = None) -> AsyncTDCController:
+        """Like :meth:`get` but returns the awaitable wrapper."""
+        with self._lock:
+            return self._async[self.resolve(device_id)]
+
+    def resolve(self, device_id: Optional[str] = None) -> str:
+        """Return the canonical serial for *device_id* (``None`` → active cube)."""
+        with self._lock:
+            key = self.active if device_id is None else self._resolve(device_id)
+            if key is None:
+                raise KeyError(device_id)
+            return key
+
+    def set_active(self, device_id: str) -> str:
+        with self._lock:
+            key = self._resolve(device_id)
+            if key is None:
+                raise KeyError(device_id)
+            self.active = key
+            return key
+
+    def ids(self) -> List[str]:
+        with self._lock:
+            return list(self._devices)
+
+    def items(self) -> List[tuple[str, TDCController]]:
+        with self._lock:
+            return list(self._devices.items())
+
+    def describe(self) -> List[dict]:
+        """JSON‑friendly summary used by ``GET /devices``."""
+        with self._lock:
+            return [
+                {"id": key, "port": ctrl.serial_port, "active": key == self.active}
+                for key, ctrl in self._devices.items()
+            ]
+
+    def __len__(self) -> int:
+        return len(self._devices)
+
+    # ─── internal helpers ─────────────────────────────────────────────────
+    def _resolve(self, device_id: str) -> Optional[str]:
+        """Map serial, port or port basename onto a registry key."""
+        if device_id in self._devices:
+            return device_id
+        for key, ctrl in self._devices.items():
+            port = ctrl.serial_port
+            if device_id in (port, os.path.basename(port)):
+                return key
+        return None
+
+    @staticmethod
+    def _serial_for(port: str) -> str:
+        """Best‑effort serial number for a port opened by name only."""
+        for serial, dev in find_tdc001_devices().items():
+            if dev == port:
+                return serial
+        return os.path.basename(port)                # unknown cube → use port name
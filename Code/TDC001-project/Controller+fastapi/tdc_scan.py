@@ -0,0 +1,180 @@
+"""tdc_scan.py – multi‑axis raster scans over several TDC001 cubes.
+
+Give :class:`RasterScan` one :class:`~tdc001.TDCController` per axis plus the
+positions to visit – either an ``(N, axes)`` array of points, a grid of
+shape ``(n0, n1, …, axes)``, or one vector per axis to be meshed – and an
+acquisition callback.  The scan then
+
+* visits the grid in **snake (serpentine) order** so no axis flies back at
+  the end of a line,
+* moves all axes that change **at the same time** and only those,
+* calls ``acquire(i, target)`` once the stage has settled, and
+* runs the optional ``process(i, data)`` step on a background thread
+  **while the next move is already under way** (e.g. camera read‑out or
+  fitting that does not need the stage to stand still).
+
+Timestamps and the actual encoder positions come back as NumPy arrays in a
+:class:`ScanResult`::
+
+    x, y = TDCController("/dev/ttyUSB0"), TDCController("/dev/ttyUSB1")
+    scan = RasterScan.from_axes([y, x], [np.arange(0, 20000, 500), np.arange(0, 50000, 500)])
+    res = scan.run(acquire=lambda i, p: camera.expose(), process=lambda i, img: img.mean())
+    image = res.to_grid(res.values)          # back in (ny, nx) layout
+
+Positions are encoder counts.  Needs NumPy (not part of the server image).
+"""
+from __future__ import annotations
+
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, Callable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from tdc001 import TDCController
+
+__all__ = ["RasterScan", "ScanResult", "snake_order"]
+
+
+def snake_order(shape: Tuple[int, ...]) -> np.ndarray:
+    """Grid indices ``(N, ndim)`` in serpentine order; the last axis is fastest.
+
+    Every time an axis finishes a line, the next line along it runs the
+    other way – in any number of dimensions.
+    """
+    shape = tuple(int(n) for n in shape)
+    visit = np.indices(shape).reshape(len(shape), -1)   # C order = order of visits
+    idx = visit.copy()
+    for k in range(1, len(shape)):
+        lines_before = np.ravel_multi_index(visit[:k], shape[:k])
+        back = lines_before % 2 == 1
+        idx[k, back] = shape[k] - 1 - visit[k, back]
+    return idx.T
+
+
+@dataclass
+class ScanResult:
+    """Everything recorded by :meth:`RasterScan.run` (row *i* = *i*‑th point visited)."""
+
+    grid_shape: Tuple[int, ...]
+    grid_index: np.ndarray                  # (N, ndim) grid index of each point
+    targets: np.ndarray                     # (N, axes) commanded counts
+    positions: np.ndarray                   # (N, axes) encoder counts when acquisition started
+    t_move: np.ndarray                      # (N,) s since start – move issued
+    t_settled: np.ndarray                   # (N,) s – all axes idle (+ settle)
+    t_acquired: np.ndarray                  # (N,) s – acquire() returned
+    values: List[Any] = field(default_factory=list)  # process() result, else acquire() result
+    completed: int = 0                      # points finished (< N if stopped early)
+
+    def to_grid(self, values: Sequence[Any] | np.ndarray) -> np.ndarray:
+        """Put per‑point *values* (in visiting order) back into the grid layout."""
+        vals = np.asarray(values)
+        out = np.full(self.grid_shape + vals.shape[1:], np.nan if vals.dtype.kind == "f" else 0,
+                      dtype=vals.dtype if vals.dtype != object else object)
+        n = len(vals)
+        out[tuple(self.grid_index[:n].T)] = vals
+        return out
+
+
+class RasterScan:
+    """Raster scan over ``len(axes)`` cubes (see module docstring)."""
+
+    def __init__(self, axes: Sequence[TDCController], points: np.ndarray, *,
+                 snake: bool = True, settle: float = 0.0, timeout: float = 120) -> None:
+        pts = np.asarray(points)
+        if pts.shape[-1] != len(axes):
+            raise ValueError(f"points have {pts.shape[-1]} coordinates but {len(axes)} axes were given")
+        if pts.ndim == 2:                     # already a list of points, keep its order
+            self.grid_shape = (len(pts),)
+            self.grid_index = np.arange(len(pts))[:, None]
+        else:                                 # (n0, n1, …, axes) grid
+            self.grid_shape = pts.shape[:-1]
+            self.grid_index = snake_order(self.grid_shape) if snake else \
+                np.indices(self.grid_shape).reshape(len(self.grid_shape), -1).T
+        self.targets = np.rint(pts[tuple(self.grid_index.T)]).astype(np.int64)
+        self.axes = list(axes)
+        self.settle = settle
+        self.timeout = timeout
+        self._stop = threading.Event()
+
+    @classmethod
+    def from_axes(cls, axes: Sequence[TDCController], vectors: Sequence[np.ndarray], **kwargs) -> "RasterScan":
+        """Mesh one position vector per axis (first = slowest) into a grid."""
+        grids = np.meshgrid(*[np.asarray(v) for v in vectors], indexing="ij")
+        return cls(axes, np.stack(grids, axis=-1), **kwargs)
+
+    def __len__(self) -> int:
+        return len(self.targets)
+
+    def stop(self) -> None:
+        """Ask a running :meth:`run` to stop after the current point (thread‑safe)."""
+        self._stop.set()
+
+    # ─── the scan loop ────────────────────────────────────────────────────
+    def run(self, acquire: Optional[Callable[[int, np.ndarray], Any]] = None,
+            process: Optional[Callable[[int, Any], Any]] = None) -> ScanResult:
+        """Visit every point; see module docstring for *acquire* / *process*."""
+        n, n_axes = self.targets.shape
+        res = ScanResult(
+            grid_shape=self.grid_shape,
+            grid_index=self.grid_index,
+            targets=self.targets,
+            positions=np.zeros((n, n_axes), dtype=np.int64),
+            t_move=np.full(n, np.nan),
+            t_settled=np.full(n, np.nan),
+            t_acquired=np.full(n, np.nan),
+            values=[None] * n,
+        )
+        self._stop.clear()
+        pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="scan-process") if process else None
+        pending: List[Future] = []
+        last = np.full(n_axes, np.iinfo(np.int64).min)  # force every axis to move first
+        t0 = time.perf_counter()
+        try:
+            for i in range(n):
+                if self._stop.is_set():
+                    break
+                target = self.targets[i]
+                res.t_move[i] = time.perf_counter() - t0
+                self._move(target, target != last)
+                last = target
+                if self.settle:
+                    time.sleep(self.settle)
+                res.t_settled[i] = time.perf_counter() - t0
+                res.positions[i] = [ax.status["position"] for ax in self.axes]
+                data = acquire(i, target) if acquire else None
+                res.t_acquired[i] = time.perf_counter() - t0
+                if pool is not None:          # overlaps with the next move
+                    pending.append(pool.submit(self._process, process, res.values, i, data))
+                else:
+                    res.values[i] = data
+                res.completed = i + 1
+        except BaseException:
+            for ax in self.axes:              # don't leave anything running
+                try:
+                    ax.stop()
+                except Exception:
+                    pass
+            raise
+        finally:
+            if pool is not None:
+                pool.shutdown(wait=True)
+        for fut in pending:
+            fut.result()                      # re‑raise errors from process()
+        return res
+
+    def _move(self, target: np.ndarray, changed: np.ndarray) -> None:
+        """Start every changed axis, then wait for all of them."""
+        moving = []
+        for ax, pos, go in zip(self.axes, target.tolist(), changed.tolist()):
+            if go:
+                ax.move_absolute(pos, wait=False)
+                moving.append(ax)
+        for ax in moving:
+            ax.wait_move(timeout=self.timeout)
+
+    @staticmethod
+    def _process(fn: Callable[[int, Any], Any], values: List[Any], i: int, data: Any) -> None:
+        values[i] = fn(i, data)
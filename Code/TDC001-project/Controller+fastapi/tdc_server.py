@@ -1,20 +1,102 @@
 #!/usr/bin/env python3
 """Unified FastAPI server for Thorlabs TDC001 – v1.4 UI compatible (no Python Zeroconf)"""
 
-from fastapi import FastAPI, HTTPException
-from pydantic import BaseModel
-from tdc001 import TDCController, find_tdc001_ports
+from fastapi import FastAPI, HTTPException, Request, Response, WebSocket, WebSocketDisconnect
+from pydantic import BaseModel, Field
+from tdc001 import (AsyncTDCController, MoveSuperseded, Tee, TDCController, TimingCollector,
+                    find_tdc001_ports)
+from tdc_registry import DeviceRegistry
+from tdc_jobs import JobManager
+from tdc_group import AxisMove, GroupMoveError, move_group
+from tdc_hub import StatusHub, diff_status
+from tdc_jog import JogSession
+from tdc_beacon import Beacon
+from tdc_telemetry import FLAGS, RECORD, Telemetry, npy_header
+from tdc_recorder import Recorder
+from tdc_metrics import (CONTENT_TYPE, ControllerMetrics, Counter, Gauge, Histogram,
+                         MetricsRegistry, RequestMetrics)
+from typing import Literal
+import anyio
+import asyncio
+import json
 import logging
+import os
+import time
 
 log = logging.getLogger("tdc-server")
 logging.basicConfig(level=logging.INFO)
 
-app = FastAPI(title="TDC001 API", version="1.4.0")
+app = FastAPI(title="TDC001 API", version="1.5.0")
 
-controller: TDCController | None = None
+registry = DeviceRegistry()   # every cube on this host, keyed by serial number
+jobs = JobManager()           # non-blocking motion jobs (see tdc_jobs.py)
+hub = StatusHub(registry)     # shared status sampler behind /ws/status
+beacon = Beacon(              # UDP discovery responder (TDC_BEACON=0 turns it off)
+    registry.ids,
+    http_port=int(os.getenv("TDC_HTTP_PORT", "8000")),
+    version=app.version,
+    public_url=os.getenv("TDC_PUBLIC_URL"),
+)
+telemetry = Telemetry(        # recent motion history behind /telemetry (TDC_TELEMETRY_RATE=0 turns it off)
+    registry,
+    rate=float(os.getenv("TDC_TELEMETRY_RATE", "50")),
+    seconds=float(os.getenv("TDC_TELEMETRY_SECONDS", "600")),
+)
+recorder = Recorder(          # long-run telemetry log on disk (only when TDC_RECORD_DIR is set)
+    os.getenv("TDC_RECORD_DIR", ""),
+    max_bytes=int(float(os.getenv("TDC_RECORD_MAX_MB", "64")) * (1 << 20)),
+    max_seconds=float(os.getenv("TDC_RECORD_MAX_SECONDS", "3600")),
+) if os.getenv("TDC_RECORD_DIR") else None
+
+# ───────────── metrics (scraped at /metrics, see tdc_metrics.py) ─────────────
+
+def device_label(ctrl: TDCController) -> str:
+    for key, c in registry.items():
+        if c is ctrl:
+            return key
+    return ctrl.serial_port
+
+def _job_states():
+    counts = {state: 0 for state in ("queued", "running", "done", "failed", "cancelled")}
+    for job in jobs.list():
+        counts[job.state] += 1
+    return [((state,), n) for state, n in counts.items()]
+
+def _threads():
+    limiter = anyio.to_thread.current_default_thread_limiter()
+    return [(("busy",), limiter.borrowed_tokens), (("limit",), limiter.total_tokens)]
+
+def _recorder_queue():
+    if recorder is None:
+        return []
+    return [(("queued",), recorder.backlog), (("dropped",), recorder.dropped)]
+
+metrics = MetricsRegistry()
+app.add_middleware(
+    RequestMetrics,
+    requests=metrics.add(Counter("tdc_http_requests_total", "HTTP requests by route and status.",
+                                 ("method", "route", "status"))),
+    latency=metrics.add(Histogram("tdc_http_request_duration_seconds", "HTTP request latency.",
+                                  ("method", "route"))),
+)
+# TDC_TRACE=1 also keeps per-phase move timings in memory → GET /debug/timings
+timings = TimingCollector() if os.getenv("TDC_TRACE") == "1" else None
+TDCController.instrumentation = (
+    Tee(ControllerMetrics(metrics, device_label), timings) if timings
+    else ControllerMetrics(metrics, device_label)
+)
+metrics.add(Gauge("tdc_devices_connected", "Open TDC001 cubes.", collect=lambda: [((), len(registry))]))
+metrics.add(Gauge("tdc_jobs", "Jobs currently kept, by state.", ("state",), collect=_job_states))
+metrics.add(Gauge("tdc_worker_threads", "Threadpool tokens for blocking calls.", ("kind",), collect=_threads))
+metrics.add(Gauge("tdc_event_loop_tasks", "Tasks alive on the server's event loop.",
+                  collect=lambda: [((), len(asyncio.all_tasks()))]))
+metrics.add(Gauge("tdc_recorder_samples", "Telemetry recorder backlog and losses.", ("kind",),
+                  collect=_recorder_queue))
 
 # ───────────── models ─────────────
 
+MAX_REPEAT = 100_000                 # per step and per sequence – keeps one POST from running for ever
+
 class ConnectRequest(BaseModel):
     port: str
 
@@ -23,119 +105,491 @@ class MoveRequest(BaseModel):
 
 class AbsoluteRequest(BaseModel):
     position: int
+    retarget: bool = False           # latest target wins: replaces a running retarget move
+
+class JobRequest(BaseModel):
+    action: Literal["move_relative", "move_absolute", "home"]
+    device: str | None = None        # serial / port; None → active cube
+    steps: int | None = None         # move_relative
+    position: int | None = None      # move_absolute
+
+class SequenceStep(BaseModel):
+    action: Literal["move_relative", "move_absolute", "home", "dwell"]
+    steps: int | None = None         # move_relative
+    position: int | None = None      # move_absolute
+    dwell: float = 0.0               # seconds to wait after the step (the whole step for "dwell")
+    repeat: int = Field(1, ge=1, le=MAX_REPEAT)   # run this step n times in a row
+
+class SequenceRequest(BaseModel):
+    device: str | None = None
+    steps: list[SequenceStep]
+    repeat: int = Field(1, ge=1, le=MAX_REPEAT)   # run the whole list n times
+
+class AxisTarget(BaseModel):
+    device: str                      # serial / port
+    position: int | None = None      # absolute target …
+    steps: int | None = None         # … or relative move
+
+class GroupMoveRequest(BaseModel):
+    axes: list[AxisTarget]
 
 # ───────────── helper ─────────────
 
-def ensure_controller() -> TDCController:
-    if controller is None:
-        raise HTTPException(
-            status_code=503,
-            detail="TDC001 device not connected. Call /ports to see available devices.",
-        )
-    return controller
+def ensure_controller(device_id: str | None = None) -> AsyncTDCController:
+    """Return the cube for *device_id*, or the active cube when it is ``None``."""
+    try:
+        return registry.get_async(device_id)
+    except KeyError:
+        if device_id is None:
+            raise HTTPException(
+                status_code=503,
+                detail="TDC001 device not connected. Call /ports to see available devices.",
+            )
+        raise HTTPException(status_code=404, detail=f"Unknown TDC001 device '{device_id}'. Call /devices.")
 
 # ───────────── lifecycle ─────────────
 
 @app.on_event("startup")
 def startup_event() -> None:
-    global controller
-    ports = find_tdc001_ports()
-    if not ports:
+    if not registry.open_all():
         log.warning("No TDC001 cubes detected at startup – API running in degraded mode.")
-        controller = None
-    else:
-        controller = TDCController(serial_port=ports[0])
-        log.info("Connected to TDC001 on %s", ports[0])
+
+@app.on_event("startup")
+async def start_status_hub() -> None:
+    hub.start()
+
+@app.on_event("startup")
+async def start_telemetry() -> None:
+    if recorder is not None:
+        recorder.start()
+        telemetry.add_listener(recorder.push)
+    telemetry.start()
+
+@app.on_event("startup")
+async def start_beacon() -> None:
+    if os.getenv("TDC_BEACON", "1") == "0":
+        return
+    try:
+        await beacon.start()
+    except OSError as e:      # port taken / no network – HTTP discovery still works
+        log.warning("UDP beacon disabled: %s", e)
+
+@app.on_event("shutdown")
+async def stop_status_hub() -> None:
+    await hub.stop()
+
+@app.on_event("shutdown")
+async def stop_telemetry() -> None:
+    await telemetry.stop()
+    if recorder is not None:
+        await asyncio.to_thread(recorder.stop)    # final write + index update
+
+@app.on_event("shutdown")
+async def stop_beacon() -> None:
+    await beacon.stop()
 
 @app.on_event("shutdown")
 def shutdown_event() -> None:
-    global controller
-    if controller:
-        controller.close()
-        controller = None
-        log.info("TDC001 connection closed.")
+    jobs.cancel_all()
+    registry.close_all()
 
-# ───────────── endpoints ─────────────
+# ───────────── status (plain or long-poll) ─────────────
+# Without since: the status dict, as always (+ X-Status-Version header).
+# With since=<version>: wait up to *wait* s (max 60) for the cube to change
+# after that version, then {"version", "status"}; 304 if nothing changed.
+# Waiting parks a coroutine on the StatusHub – no thread is held.
 
-@app.get("/ports")
-def list_ports() -> list[str]:
-    return find_tdc001_ports()
+MAX_LONG_POLL = 60.0
 
-@app.post("/connect")
-def connect(req: ConnectRequest):
-    global controller
+async def read_status(device_id: str | None, response: Response, since: int | None, wait: float):
+    ctrl = ensure_controller(device_id)
+    key = registry.resolve(device_id)
     try:
-        if controller:
-            controller.close()
-        controller = TDCController(serial_port=req.port)
-        return {"status": "connected", "port": req.port}
-    except Exception as e:
-        controller = None
-        raise HTTPException(status_code=500, detail=str(e))
-
-@app.post("/disconnect")
-def disconnect():
-    global controller
-    if controller:
-        controller.close()
-        controller = None
-    return {"status": "disconnected"}
+        version, snap = hub.get(key)
+    except KeyError:                                  # closed between the two lines
+        raise HTTPException(status_code=503, detail="TDC001 device disconnected.")
+    if since is None:
+        response.headers["X-Status-Version"] = str(version)
+        return ctrl.status
+    if version == since:
+        if not await hub.wait_device(key, since, min(max(wait, 0.0), MAX_LONG_POLL)):
+            return Response(status_code=304, headers={"X-Status-Version": str(version)})
+        try:
+            version, snap = hub.get(key)
+        except KeyError:
+            raise HTTPException(status_code=503, detail="TDC001 device disconnected.")
+    response.headers["X-Status-Version"] = str(version)
+    return {"version": version, "status": snap}
 
-@app.get("/status")
-def status():
-    return ensure_controller().status
+# ───────────── actions (shared by legacy + device routes) ─────────────
+# All awaitable: a long move parks a coroutine, not a threadpool worker.
 
-@app.post("/move_relative")
-def move_relative(req: MoveRequest):
-    ctrl = ensure_controller()
+async def do_move_relative(ctrl: AsyncTDCController, req: MoveRequest):
     try:
-        ctrl.move_relative(req.steps)
+        await ctrl.move_relative(req.steps)
         return {"status": "moved", "steps": req.steps}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
-@app.post("/move_absolute")
-def move_absolute(req: AbsoluteRequest):
-    ctrl = ensure_controller()
+async def do_move_absolute(ctrl: AsyncTDCController, req: AbsoluteRequest):
     try:
-        ctrl.move_absolute(req.position)
+        await ctrl.move_absolute(req.position, retarget=req.retarget)
         return {"status": "moved", "position": req.position}
+    except MoveSuperseded as e:                       # a newer retarget took over
+        return {"status": "superseded", "position": req.position, "superseded_by": e.superseded_by}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
-@app.post("/home")
-def home():
-    ctrl = ensure_controller()
+async def do_home(ctrl: AsyncTDCController):
     try:
-        ctrl.home()
+        await ctrl.home()
         return {"status": "homed"}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
-@app.post("/identify")
-def identify():
-    ctrl = ensure_controller()
-    ctrl.identify()
+async def do_identify(ctrl: AsyncTDCController):
+    await ctrl.identify()
     return {"status": "identifying"}
 
-@app.post("/stop")
-def stop():
-    ctrl = ensure_controller()
+async def do_stop(ctrl: AsyncTDCController):
     try:
-        ctrl._cube.stop(immediate=True)
+        await ctrl.stop()
         return {"status": "stopped"}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+# ───────────── endpoints (active cube) ─────────────
+
+@app.get("/ports")
+async def list_ports() -> list[str]:
+    return await asyncio.to_thread(find_tdc001_ports)
+
+@app.post("/connect")
+async def connect(req: ConnectRequest):
+    # cubes stay open in the registry – /connect only opens (if needed) and selects
+    try:
+        device_id = await asyncio.to_thread(registry.open, req.port)
+        registry.set_active(device_id)
+        return {"status": "connected", "port": req.port, "device": device_id}
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.post("/disconnect")
+async def disconnect():
+    if registry.active is not None:
+        await asyncio.to_thread(registry.close, registry.active)
+    return {"status": "disconnected"}
+
+@app.get("/status")
+async def status(response: Response, since: int | None = None, wait: float = 25.0):
+    return await read_status(None, response, since, wait)
+
+@app.post("/move_relative")
+async def move_relative(req: MoveRequest):
+    return await do_move_relative(ensure_controller(), req)
+
+@app.post("/move_absolute")
+async def move_absolute(req: AbsoluteRequest):
+    return await do_move_absolute(ensure_controller(), req)
+
+@app.post("/home")
+async def home():
+    return await do_home(ensure_controller())
+
+@app.post("/identify")
+async def identify():
+    return await do_identify(ensure_controller())
+
+@app.post("/stop")
+async def stop():
+    return await do_stop(ensure_controller())
+
+# ───────────── bulk status (all cubes, versioned) ─────────────
+# ETag = hub version: If-None-Match with the current one → 304.  since=<version>
+# only sends cubes that changed after it, as field diffs when possible.
+
+_bulk_cache: tuple[int, bytes] = (-1, b"")        # (version, full body) – dashboards share it
+
+@app.get("/status/all")
+async def status_all(request: Request, since: int | None = None):
+    global _bulk_cache
+    version = hub.version
+    etag = f'"{version}"'
+    if request.headers.get("if-none-match") == etag or since == version:
+        return Response(status_code=304, headers={"ETag": etag})
+    if since is None and _bulk_cache[0] == version:
+        body = _bulk_cache[1]
+    else:
+        body = json.dumps({"version": version, "since": since, "ids": registry.ids(),
+                           "devices": hub.changes_since(since)}).encode()
+        if since is None:
+            _bulk_cache = (version, body)
+    return Response(content=body, media_type="application/json", headers={"ETag": etag})
+
+# ───────────── endpoints (any cube, by serial or port) ─────────────
+
+@app.get("/devices")
+async def list_devices() -> list[dict]:
+    return registry.describe()
+
+@app.get("/devices/{device_id}/status")
+async def device_status(device_id: str, response: Response, since: int | None = None, wait: float = 25.0):
+    return await read_status(device_id, response, since, wait)
+
+@app.post("/devices/{device_id}/move_relative")
+async def device_move_relative(device_id: str, req: MoveRequest):
+    return await do_move_relative(ensure_controller(device_id), req)
+
+@app.post("/devices/{device_id}/move_absolute")
+async def device_move_absolute(device_id: str, req: AbsoluteRequest):
+    return await do_move_absolute(ensure_controller(device_id), req)
+
+@app.post("/devices/{device_id}/home")
+async def device_home(device_id: str):
+    return await do_home(ensure_controller(device_id))
+
+@app.post("/devices/{device_id}/identify")
+async def device_identify(device_id: str):
+    return await do_identify(ensure_controller(device_id))
+
+@app.post("/devices/{device_id}/stop")
+async def device_stop(device_id: str):
+    return await do_stop(ensure_controller(device_id))
+
+# ───────────── group moves (several cubes at once) ─────────────
+
+@app.post("/group_move")
+async def group_move(req: GroupMoveRequest):
+    """Start every axis together; returns when the slowest one is done."""
+    if not req.axes:
+        raise HTTPException(status_code=422, detail="A group move needs at least one axis.")
+    moves, seen = [], set()
+    for i, ax in enumerate(req.axes):
+        if (ax.position is None) == (ax.steps is None):
+            raise HTTPException(status_code=422, detail=f"Axis {i}: give exactly one of 'position' or 'steps'.")
+        ctrl = ensure_controller(ax.device)
+        key = registry.resolve(ax.device)
+        if key in seen:
+            raise HTTPException(status_code=422, detail=f"Axis {i}: device '{ax.device}' is listed twice.")
+        seen.add(key)
+        moves.append(AxisMove(key, ctrl, position=ax.position, steps=ax.steps))
+    try:
+        return await move_group(moves)
+    except GroupMoveError as e:
+        raise HTTPException(status_code=500, detail={"error": str(e), "axes": e.axes})
+
+# ───────────── jobs (return at once, poll /jobs/{id}) ─────────────
+
+def ensure_job(job_id: str):
+    try:
+        return jobs.get(job_id)
+    except KeyError:
+        raise HTTPException(status_code=404, detail=f"Unknown job '{job_id}'.")
+
+@app.post("/jobs", status_code=202)
+async def submit_job(req: JobRequest):
+    ctrl = ensure_controller(req.device)
+    params: dict = {}
+    if req.action == "move_relative":
+        if req.steps is None:
+            raise HTTPException(status_code=422, detail="move_relative needs 'steps'.")
+        params["steps"] = req.steps
+    elif req.action == "move_absolute":
+        if req.position is None:
+            raise HTTPException(status_code=422, detail="move_absolute needs 'position'.")
+        params["position"] = req.position
+    job = jobs.submit(registry.resolve(req.device), ctrl, req.action, **params)
+    return job.to_dict()
+
+@app.post("/sequences", status_code=202)
+async def submit_sequence(req: SequenceRequest):
+    """Run a whole move list server-side; track/cancel it through /jobs/{id}."""
+    ctrl = ensure_controller(req.device)
+    if not req.steps:
+        raise HTTPException(status_code=422, detail="A sequence needs at least one step.")
+    if any(st.dwell < 0 for st in req.steps):
+        raise HTTPException(status_code=422, detail="'dwell' must be >= 0.")
+    for i, st in enumerate(req.steps):
+        if st.action == "move_relative" and st.steps is None:
+            raise HTTPException(status_code=422, detail=f"Step {i}: move_relative needs 'steps'.")
+        if st.action == "move_absolute" and st.position is None:
+            raise HTTPException(status_code=422, detail=f"Step {i}: move_absolute needs 'position'.")
+    steps = [st.model_dump(exclude_none=True) for st in req.steps]
+    job = jobs.submit(registry.resolve(req.device), ctrl, "sequence", steps=steps, repeat=req.repeat)
+    return job.to_dict()
+
+@app.post("/devices/{device_id}/sequences", status_code=202)
+async def device_sequence(device_id: str, req: SequenceRequest):
+    req.device = device_id
+    return await submit_sequence(req)
+
+@app.get("/jobs")
+async def list_jobs() -> list[dict]:
+    return [job.to_dict() for job in jobs.list()]
+
+@app.get("/jobs/{job_id}")
+async def get_job(job_id: str):
+    return ensure_job(job_id).to_dict()
+
+@app.get("/jobs/{job_id}/wait")
+async def wait_job(job_id: str, timeout: float = 30.0):
+    ensure_job(job_id)
+    return (await jobs.wait(job_id, timeout=timeout)).to_dict()
+
+@app.post("/jobs/{job_id}/cancel")
+async def cancel_job(job_id: str):
+    ensure_job(job_id)
+    return jobs.cancel(job_id).to_dict()
+
+# ───────────── push status stream ─────────────
+# Message 1 is {"type": "snapshot", "status": {...}}; after that only
+# {"type": "diff", "changes": {...}} with the fields that changed.  max_rate
+# caps messages per second – changes in between are merged into one diff.
+# A reader task notices a client that goes away while nothing changes.
+
+async def _until_closed(ws: WebSocket) -> None:
+    """Return once the client has disconnected (anything it sends is ignored)."""
+    try:
+        while (await ws.receive())["type"] != "websocket.disconnect":
+            pass
+    except (WebSocketDisconnect, RuntimeError):
+        pass
+
+async def _next_change(key: str, version: int, min_gap: float) -> None:
+    await asyncio.sleep(min_gap)                              # per-client rate cap
+    await hub.wait_device(key, version)
+
+@app.websocket("/ws/status")
+async def status_stream(ws: WebSocket, device: str | None = None, max_rate: float = 20.0):
+    await ws.accept()
+    try:
+        key = registry.resolve(device)
+    except KeyError:
+        await ws.close(code=1008, reason=f"Unknown TDC001 device '{device}'.")
+        return
+    min_gap = 1.0 / min(max(max_rate, 0.1), 100.0)
+    sent: dict | None = None
+    closed = asyncio.create_task(_until_closed(ws))
+    try:
+        while not closed.done():
+            try:
+                version, snap = hub.get(key)
+            except KeyError:
+                await ws.close(code=1011, reason="Device disconnected.")
+                return
+            if sent is None:
+                await ws.send_json({"type": "snapshot", "device": key, "version": version, "status": snap})
+            elif changes := diff_status(sent, snap):
+                await ws.send_json({"type": "diff", "device": key, "version": version, "changes": changes})
+            sent = snap
+            changed = asyncio.create_task(_next_change(key, version, min_gap))
+            try:
+                await asyncio.wait((closed, changed), return_when=asyncio.FIRST_COMPLETED)
+            finally:
+                changed.cancel()
+    except WebSocketDisconnect:
+        pass
+    finally:
+        closed.cancel()
+
+# ───────────── jog (hold-to-move, see tdc_jog.py) ─────────────
+# {"type": "jog", "direction", "velocity"} starts continuous motion or changes
+# it on the fly, {"type": "heartbeat"} keeps it going, {"type": "stop"} ends it.
+# No message for `deadman` s (default TDC_JOG_DEADMAN = 0.5) or a closed
+# socket stops the cube.
+
+JOG_DEADMAN = float(os.getenv("TDC_JOG_DEADMAN", "0.5"))
+
+@app.websocket("/ws/jog")
+async def jog_stream(ws: WebSocket, device: str | None = None, deadman: float | None = None):
+    await ws.accept()
+    try:
+        ctrl = registry.get_async(device)
+    except KeyError:
+        await ws.close(code=1008, reason=f"Unknown TDC001 device '{device}'.")
+        return
+    session = JogSession(ctrl, deadman=min(max(deadman or JOG_DEADMAN, 0.1), 5.0), notify=ws.send_json)
+    try:
+        while True:
+            raw = await ws.receive_text()
+            try:
+                reply = await session.handle(json.loads(raw))
+            except ValueError as e:                           # bad JSON / direction / speed
+                reply = {"type": "error", "detail": str(e)}
+            if reply is not None:
+                await ws.send_json(reply)
+    except WebSocketDisconnect:
+        pass
+    finally:
+        await session.close()
+
+# ───────────── telemetry (binary history, see tdc_telemetry.py) ─────────────
+# Default window is the last 10 s; start/end are epoch seconds.  "npy" loads
+# with numpy.load(), "raw" is the same little-endian records without header.
+
+@app.get("/telemetry")
+async def get_telemetry(device: str | None = None, last: float = 10.0, start: float | None = None,
+                        end: float | None = None, max_points: int | None = None,
+                        format: Literal["npy", "raw"] = "npy"):
+    try:
+        key = registry.resolve(device)
+    except KeyError:
+        if device is None:
+            raise HTTPException(
+                status_code=503,
+                detail="TDC001 device not connected. Call /ports to see available devices.",
+            )
+        raise HTTPException(status_code=404, detail=f"Unknown TDC001 device '{device}'. Call /devices.")
+    try:
+        ring = telemetry.ring(key)
+    except KeyError:
+        raise HTTPException(status_code=503, detail="No telemetry yet (TDC_TELEMETRY_RATE=0?).")
+    if max_points is not None and max_points < 1:
+        raise HTTPException(status_code=422, detail="'max_points' must be >= 1.")
+    if start is None:
+        start = (end if end is not None else time.time()) - last
+    count, data = ring.window(start, end, max_points)
+    return Response(
+        content=npy_header(count) + data if format == "npy" else data,
+        media_type="application/octet-stream",
+        headers={
+            "X-TDC-Device": key,
+            "X-TDC-Samples": str(count),
+            "X-TDC-Rate": str(telemetry.rate),
+            "X-TDC-Record": RECORD.format,
+            "X-TDC-Flags": ",".join(FLAGS),
+        },
+    )
+
+@app.get("/devices/{device_id}/telemetry")
+async def device_telemetry(device_id: str, last: float = 10.0, start: float | None = None,
+                           end: float | None = None, max_points: int | None = None,
+                           format: Literal["npy", "raw"] = "npy"):
+    return await get_telemetry(device_id, last, start, end, max_points, format)
+
 # ───────────── UI Compatibility Aliases ─────────────
 
 @app.post("/move_rel")
-def move_rel_alias(req: MoveRequest):
-    return move_relative(req)
+async def move_rel_alias(req: MoveRequest):
+    return await move_relative(req)
 
 @app.post("/move_abs")
-def move_abs_alias(req: AbsoluteRequest):
-    return move_absolute(req)
+async def move_abs_alias(req: AbsoluteRequest):
+    return await move_absolute(req)
+
+@app.get("/metrics")
+async def get_metrics():
+    return Response(content=metrics.render(), media_type=CONTENT_TYPE)
+
+@app.get("/debug/timings")
+async def get_timings(reset: bool = False):
+    """p50/p95/p99 in ms per operation and phase (command, to_motion, motion, detection)."""
+    if timings is None:
+        raise HTTPException(status_code=404, detail="Timing collection is off. Start the server with TDC_TRACE=1.")
+    summary = timings.summary()
+    if reset:
+        timings.reset()
+    return summary
 
 # ───────────── Optional Health Check ─────────────
 # also an identifier for the frontend to locate the actual TDC001 apis on the network
@@ -143,6 +597,6 @@ def move_abs_alias(req: AbsoluteRequest):
 # the user will see this as available IPs to connect to for controlling steppers
 
 @app.get("/ping")
-def ping():
+async def ping():
     return {"backend": "TDC001"}
 
@@ -0,0 +1,331 @@
+"""tdc_sim.py – a virtual TDC001 cube for hardware‑free testing.
+
+:class:`SimulatedTDC001` is a drop‑in stand‑in for
+:class:`thorlabs_apt_device.TDC001`: same ``status_``/``status`` dicts, same
+``move_relative``/``move_absolute``/``home``/``stop`` calls, same listener
+and error‑callback hooks – but the "stage" is a small physics loop running on
+its own thread.
+
+* **Motion model** – trapezoidal profile with configurable max velocity and
+  acceleration (counts/s, counts/s²), travel limits and limit switches.
+  ``velparams`` / :meth:`~SimulatedTDC001.set_velocity_params` use APT units
+  like the real cube (see :data:`tdc001.APT_VELOCITY_SCALE`).
+* **Time scale** – ``time_scale=10`` makes a 30 s move finish in 3 s so long
+  scans can be fast‑forwarded.
+* **Fault injection** – :meth:`SimulatedTDC001.inject_fault` can stall the
+  stage, drop completion messages, raise device errors, delay commands or
+  make the cube go silent.
+
+Nothing here needs hardware.  :class:`~tdc001.TDCController` opens a
+simulated cube for any port named ``"sim:<n>"``, and :func:`~tdc001.
+find_tdc001_devices` lists ``TDC_SIMULATE=<n>`` such cubes, so the server,
+the CLI and the GUI all run unchanged on a CI box::
+
+    TDC_SIMULATE=4 TDC_SIM_TIME_SCALE=5 uvicorn tdc_server:app
+"""
+from __future__ import annotations
+
+import logging
+import math
+import os
+import threading
+import time
+from typing import Callable, Dict, List, Optional
+
+from tdc001 import APT_ACCEL_SCALE, APT_VELOCITY_SCALE
+
+__all__ = ["SimulatedTDC001", "simulated_devices", "FAULTS"]
+
+log = logging.getLogger(__name__)
+
+FAULTS = ("stall", "drop_completion", "error", "latency", "silent")
+
+COUNTS_PER_MM = 34555                                # MTS/Z8‑style stage
+
+
+def simulated_devices() -> Dict[str, str]:
+    """``{serial: port}`` for the cubes requested via ``TDC_SIMULATE=<n>``."""
+    try:
+        count = int(os.getenv("TDC_SIMULATE", "0"))
+    except ValueError:
+        count = 0
+    return {f"sim{i}": f"sim:{i}" for i in range(1, count + 1)}
+
+
+class SimulatedTDC001:
+    """Virtual single‑channel DC servo cube (see module docstring)."""
+
+    def __init__(
+        self,
+        serial_port: str = "sim:1",
+        home: bool = False,
+        *,
+        time_scale: Optional[float] = None,
+        max_velocity: float = 50_000.0,              # counts/s  (~1.4 mm/s)
+        acceleration: float = 100_000.0,             # counts/s²
+        travel: int = 25 * COUNTS_PER_MM,            # 0 … travel counts
+        tick: float = 0.01,                          # wall seconds per physics step
+    ) -> None:
+        self.serial_port = serial_port
+        self.time_scale = float(time_scale if time_scale is not None
+                                else os.getenv("TDC_SIM_TIME_SCALE", "1"))
+        self.travel = travel
+        self.tick = tick
+
+        self.status_ = [[{
+            "position": 0,
+            "enc_count": 0,
+            "velocity": 0.0,
+            "forward_limit_switch": False,
+            "reverse_limit_switch": False,
+            "moving_forward": False,
+            "moving_reverse": False,
+            "jogging_forward": False,
+            "jogging_reverse": False,
+            "motor_connected": True,
+            "homing": False,
+            "homed": False,
+            "tracking": False,
+            "interlock": False,
+            "settled": True,
+            "motion_error": False,
+            "motor_current_limit_reached": False,
+            "channel_enabled": False,
+            "msg": "",
+            "msgid": 0,
+            "source": 0x50,
+            "dest": 0x01,
+            "chan_ident": 1,
+        }]]
+        self.status = self.status_[0][0]             # same alias the real driver has
+        self.velparams = {                           # APT units, as the real driver reports them
+            "min_velocity": 0,
+            "max_velocity": round(max_velocity * APT_VELOCITY_SCALE),
+            "acceleration": round(acceleration * APT_ACCEL_SCALE),
+        }
+
+        self._listeners: List[Callable[[str], None]] = []
+        self._error_callbacks: set = set()
+        self._faults: Dict[str, dict] = {}
+        self._lock = threading.RLock()
+
+        # physics state (floats; status["position"] is the rounded view)
+        self._pos = float(self.travel // 2)          # power‑on somewhere mid‑travel
+        self._vel = 0.0
+        self._target: Optional[float] = None         # absolute target while moving
+        self._mode = "idle"                          # idle | move | home | velocity | stopping
+        self._direction = 1
+        self._pending: Optional[str] = None          # message to send on the next tick
+        self._publish("")
+
+        self._running = True
+        self._thread = threading.Thread(target=self._run, name=f"sim-{serial_port}", daemon=True)
+        self._thread.start()
+        if home:
+            self.home()
+
+    # ─── driver API (mirrors thorlabs_apt_device) ─────────────────────────
+    def add_listener(self, fn: Callable[[str], None]) -> None:
+        self._listeners.append(fn)
+
+    def remove_listener(self, fn: Callable[[str], None]) -> None:
+        if fn in self._listeners:
+            self._listeners.remove(fn)
+
+    def register_error_callback(self, callback_function) -> None:
+        self._error_callbacks.add(callback_function)
+
+    def unregister_error_callback(self, callback_function) -> None:
+        self._error_callbacks.discard(callback_function)
+
+    def set_enabled(self, state: bool = True, bay: int = 0, channel: int = 0) -> None:
+        with self._lock:
+            self.status["channel_enabled"] = bool(state)
+
+    def set_velocity_params(self, acceleration, max_velocity, bay: int = 0, channel: int = 0) -> None:
+        """Same APT units as the real cube (not counts/s)."""
+        with self._lock:
+            self.velparams.update(acceleration=int(acceleration), max_velocity=int(max_velocity))
+
+    def move_relative(self, distance=None, now=True, bay: int = 0, channel: int = 0) -> None:
+        self._command(lambda: self._start_move(self._pos + distance))
+
+    def move_absolute(self, position=None, now=True, bay: int = 0, channel: int = 0) -> None:
+        self._command(lambda: self._start_move(float(position)))
+
+    def move_velocity(self, direction="forward", bay: int = 0, channel: int = 0) -> None:
+        if isinstance(direction, str):               # same rules as the real driver
+            forward = direction != "reverse"
+        elif isinstance(direction, bool):
+            forward = direction
+        else:
+            forward = int(direction) % 2 == 1
+        self._command(lambda: self._start_velocity(1 if forward else -1))
+
+    def home(self, bay: int = 0, channel: int = 0) -> None:
+        def start() -> None:
+            self._mode, self._target = "home", 0.0
+            self.status["homing"], self.status["homed"] = True, False
+        self._command(start)
+
+    def stop(self, immediate: bool = False, bay: int = 0, channel: int = 0) -> None:
+        def halt() -> None:
+            if self._mode == "idle":
+                return
+            if immediate:
+                self._pending = self._finish("mot_move_stopped")
+            else:
+                self._mode, self._target = "stopping", None
+        self._command(halt)
+
+    def identify(self, channel: int = 0) -> None:
+        log.info("Simulated TDC001 %s: *blink*", self.serial_port)
+
+    def close(self) -> None:
+        self._running = False
+
+    # ─── fault injection ──────────────────────────────────────────────────
+    def inject_fault(self, kind: str, **params) -> None:
+        """Turn on a fault until :meth:`clear_faults`.
+
+        ``stall``            – stage stops advancing but still reports moving
+        ``drop_completion``  – completion messages are swallowed
+        ``error``            – next move aborts with a device error
+                               (``code=…``, ``notes=…``)
+        ``latency``          – commands take effect ``seconds=…`` later
+        ``silent``           – no messages at all (unplugged USB)
+        """
+        if kind not in FAULTS:
+            raise ValueError(f"Unknown fault '{kind}'. Expected one of {FAULTS}.")
+        with self._lock:
+            self._faults[kind] = params
+
+    def clear_faults(self, kind: Optional[str] = None) -> None:
+        with self._lock:
+            if kind is None:
+                self._faults.clear()
+            else:
+                self._faults.pop(kind, None)
+
+    # ─── internals ────────────────────────────────────────────────────────
+    def _command(self, action: Callable[[], None]) -> None:
+        delay = self._faults.get("latency", {}).get("seconds", 0.0)
+        if delay:
+            threading.Timer(delay, self._locked, (action,)).start()
+        else:
+            self._locked(action)
+
+    def _locked(self, action: Callable[[], None]) -> None:
+        with self._lock:
+            action()
+
+    def _start_move(self, target: float) -> None:
+        if "error" in self._faults:
+            fault = self._faults.pop("error")
+            self.status["motion_error"] = True
+            self._emit_error(fault.get("code", 1), fault.get("notes", "simulated motion error"))
+            return
+        self._mode, self._target = "move", min(max(target, 0.0), float(self.travel))
+        self.status["motion_error"] = False
+
+    def _start_velocity(self, direction: int) -> None:
+        self._mode, self._target, self._direction = "velocity", None, direction
+
+    def _run(self) -> None:
+        last = time.monotonic()
+        while self._running:
+            time.sleep(self.tick)
+            now = time.monotonic()
+            dt, last = (now - last) * self.time_scale, now
+            with self._lock:
+                msg = self._step(dt)
+                silent = "silent" in self._faults
+                if not silent:
+                    self._publish(msg)
+            if not silent:
+                self._notify(msg)
+
+    def _step(self, dt: float) -> str:
+        """Advance the physics by *dt* simulated seconds; return the message to send."""
+        if self._pending is not None:                # e.g. immediate stop's reply
+            msg, self._pending = self._pending, None
+            return msg
+        if self._mode == "idle" or "stall" in self._faults:
+            return "mot_get_dcstatusupdate"
+
+        accel = self.velparams["acceleration"] / APT_ACCEL_SCALE     # APT units → counts/s²
+        vmax = self.velparams["max_velocity"] / APT_VELOCITY_SCALE   # APT units → counts/s
+        if self._mode == "velocity":
+            desired = self._direction * vmax
+        elif self._mode == "stopping":
+            desired = 0.0
+        else:
+            dist = self._target - self._pos
+            brake = math.sqrt(2 * accel * abs(dist))  # fastest speed we can still stop from
+            desired = math.copysign(min(vmax, brake), dist)
+        dv = max(-accel * dt, min(accel * dt, desired - self._vel))
+        self._vel += dv
+        step = self._vel * dt
+        if self._target is not None and self._mode in ("move", "home"):
+            dist = self._target - self._pos
+            if abs(dist) < 0.5 or (step * dist > 0 and abs(step) >= abs(dist)):
+                self._pos, self._vel = self._target, 0.0   # arrives within this step
+                if self._mode == "home":
+                    self.status["homing"], self.status["homed"] = False, True
+                    return self._finish("mot_move_homed")
+                return self._finish("mot_move_completed")
+        self._pos += step
+
+        # travel limits / limit switches
+        if self._pos <= 0.0 or self._pos >= self.travel:
+            self._pos = min(max(self._pos, 0.0), float(self.travel))
+            if self._mode == "home":
+                self._pos, self._vel = 0.0, 0.0
+                self.status["homing"], self.status["homed"] = False, True
+                return self._finish("mot_move_homed")
+            if self._mode in ("velocity", "stopping"):
+                self._vel = 0.0
+                return self._finish("mot_move_stopped")
+
+        if self._mode == "stopping" and abs(self._vel) < 1e-6:
+            return self._finish("mot_move_stopped")
+        return "mot_get_dcstatusupdate"
+
+    def _finish(self, msg: str) -> str:
+        self._mode, self._target, self._vel = "idle", None, 0.0
+        if "drop_completion" in self._faults:
+            return "mot_get_dcstatusupdate"
+        return msg
+
+    def _publish(self, msg: str) -> None:
+        st = self.status
+        pos = int(round(self._pos))
+        moving = self._mode != "idle"
+        st["position"] = st["enc_count"] = pos
+        st["velocity"] = abs(self._vel)
+        st["moving_forward"] = moving and (self._vel > 0 or (self._vel == 0 and self._heading() > 0))
+        st["moving_reverse"] = moving and not st["moving_forward"]
+        st["jogging_forward"] = self._mode == "velocity" and self._direction > 0
+        st["jogging_reverse"] = self._mode == "velocity" and self._direction < 0
+        st["reverse_limit_switch"] = pos <= 0
+        st["forward_limit_switch"] = pos >= self.travel
+        st["settled"] = not moving
+        st["msg"] = msg
+
+    def _heading(self) -> int:
+        if self._mode == "velocity":
+            return self._direction
+        if self._target is not None:
+            return 1 if self._target >= self._pos else -1
+        return 0
+
+    def _notify(self, msg: str) -> None:
+        for fn in tuple(self._listeners):
+            try:
+                fn(msg)
+            except Exception:
+                log.exception("Simulated TDC001 listener failed")
+
+    def _emit_error(self, code: int, notes: str) -> None:
+        for cb in tuple(self._error_callbacks):
+            cb(source=0x50, msgid=0, code=code, notes=notes)
@@ -0,0 +1,204 @@
+"""tdc_telemetry.py – recent motion history of every cube, as compact binary.
+
+:class:`Telemetry` samples each registered cube's status dict at a fixed rate
+into a per‑device :class:`Ring` – one preallocated ``bytearray`` of
+fixed‑size little‑endian records (:data:`RECORD`)::
+
+    t         float64   seconds since the epoch
+    position  int64     encoder counts
+    velocity  float32   as reported by the cube
+    flags     uint32    bit i set ⇔ status[FLAGS[i]] is true
+
+Because the buffer already *is* the wire format, a time window is exported by
+slicing bytes: no per‑sample conversion, no JSON.  Windows are found on a
+parallel array of ``time.monotonic()`` stamps, so a wall‑clock step (NTP,
+manual change) cannot break the search; ``t`` is only exported.  ``GET /telemetry`` (see
+``tdc_server.py``) returns it as ``.npy`` (``numpy.load`` gives a structured
+array) or as bare records, optionally thinned to ``max_points``.
+
+Listeners added with :meth:`Telemetry.add_listener` see every sample as it is
+taken (``tdc_recorder.py`` uses this to log long runs to disk).
+
+Rate and length come from ``TDC_TELEMETRY_RATE`` (Hz, default 50, 0 = off)
+and ``TDC_TELEMETRY_SECONDS`` (default 600).
+"""
+from __future__ import annotations
+
+import asyncio
+import logging
+import struct
+import time
+from array import array
+from typing import Callable, Dict, List, Mapping, Optional, Tuple
+
+from tdc_registry import DeviceRegistry
+
+__all__ = ["DTYPE", "FLAGS", "RECORD", "Ring", "Telemetry", "npy_header", "pack_flags"]
+
+log = logging.getLogger("tdc-server")
+
+RECORD = struct.Struct("<dqfI")                       # 24 bytes, see module docstring
+DTYPE = [("t", "<f8"), ("position", "<i8"), ("velocity", "<f4"), ("flags", "<u4")]
+
+FLAGS = (                                             # bit order of the flags column
+    "moving_forward", "moving_reverse", "jogging_forward", "jogging_reverse",
+    "homing", "homed", "settled", "tracking",
+    "forward_limit_switch", "reverse_limit_switch", "motion_error", "motor_current_limit_reached",
+    "motor_connected", "channel_enabled", "interlock",
+)
+
+
+def pack_flags(status: Mapping[str, object]) -> int:
+    """Fold the boolean status fields into one bitmask (see :data:`FLAGS`)."""
+    bits = 0
+    for i, name in enumerate(FLAGS):
+        if status.get(name):
+            bits |= 1 << i
+    return bits
+
+
+def npy_header(count: int) -> bytes:
+    """``.npy`` v1.0 header for *count* records of :data:`DTYPE`."""
+    descr = "[" + ", ".join(f"('{n}', '{t}')" for n, t in DTYPE) + "]"
+    text = f"{{'descr': {descr}, 'fortran_order': False, 'shape': ({count},), }}"
+    pad = -(10 + len(text) + 1) % 64                  # magic+version+len = 10, "\n" = 1
+    text = text + " " * pad + "\n"
+    return b"\x93NUMPY\x01\x00" + struct.pack("<H", len(text)) + text.encode("latin1")
+
+
+class Ring:
+    """Fixed‑capacity ring of :data:`RECORD` samples, oldest overwritten first."""
+
+    def __init__(self, capacity: int) -> None:
+        self.capacity = max(1, int(capacity))
+        self.buf = bytearray(self.capacity * RECORD.size)
+        self.mono = array("d", bytes(8 * self.capacity))  # monotonic stamp per slot (search key)
+        self.head = 0                                 # next slot to write
+        self.count = 0
+
+    def append(self, t: float, position: int, velocity: float, flags: int,
+               mono: Optional[float] = None) -> None:
+        RECORD.pack_into(self.buf, self.head * RECORD.size, t, position, velocity, flags)
+        self.mono[self.head] = time.monotonic() if mono is None else mono
+        self.head = (self.head + 1) % self.capacity
+        self.count = min(self.count + 1, self.capacity)
+
+    def __len__(self) -> int:
+        return self.count
+
+    def _slot(self, i: int) -> int:
+        """Buffer slot of the *i*‑th oldest sample."""
+        return (self.head - self.count + i) % self.capacity
+
+    def _time(self, i: int) -> float:
+        return self.mono[self._slot(i)]
+
+    def _bisect(self, t: float) -> int:
+        """Index of the first sample with monotonic time ≥ *t* (never decreases)."""
+        lo, hi = 0, self.count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self._time(mid) < t:
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo
+
+    def window(self, start: Optional[float] = None, end: Optional[float] = None,
+               max_points: Optional[int] = None) -> Tuple[int, bytes]:
+        """Return ``(n, records)`` with start ≤ t < end, every k‑th if thinned.
+
+        *start*/*end* are epoch seconds; they are mapped onto the monotonic
+        clock with today's offset, so the answer is the samples taken in
+        that span as the wall clock reads *now*.
+        """
+        offset = time.time() - time.monotonic()
+        lo = 0 if start is None else self._bisect(start - offset)
+        hi = self.count if end is None else self._bisect(end - offset)
+        n = max(0, hi - lo)
+        stride = 1 if not max_points or n <= max_points else -(-n // max_points)
+        mv, size = memoryview(self.buf), RECORD.size
+        if stride == 1:                               # one or two contiguous slices
+            a, b = self._slot(lo), self._slot(lo) + n
+            if b <= self.capacity:
+                return n, bytes(mv[a * size:b * size])
+            return n, bytes(mv[a * size:]) + bytes(mv[:(b - self.capacity) * size])
+        picks = range(lo, hi, stride)
+        return len(picks), b"".join(mv[s * size:(s + 1) * size] for s in map(self._slot, picks))
+
+
+class Telemetry:
+    """Sample all cubes *rate* times per second into one :class:`Ring` each."""
+
+    def __init__(self, registry: DeviceRegistry, *, rate: float = 50.0, seconds: float = 600.0) -> None:
+        self.registry = registry
+        self.rate = rate
+        self.seconds = seconds
+        self.rings: Dict[str, Ring] = {}
+        self._listeners: List[Callable[[str, tuple], None]] = []
+        self._task: Optional[asyncio.Task] = None
+
+    # ─── lifecycle ────────────────────────────────────────────────────────
+    def start(self) -> None:
+        """Begin sampling; must be called from the running event loop."""
+        if self._task is None and self.rate > 0:
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def add_listener(self, fn: Callable[[str, tuple], None]) -> None:
+        """Call ``fn(device, (t, position, velocity, flags))`` for every sample.
+
+        Runs on the event loop, so *fn* must return at once (e.g. enqueue).
+        """
+        self._listeners.append(fn)
+
+    # ─── queries ──────────────────────────────────────────────────────────
+    def ring(self, device: str) -> Ring:
+        """The ring for *device*; :class:`KeyError` if it is not being sampled."""
+        return self.rings[device]
+
+    # ─── sampling ─────────────────────────────────────────────────────────
+    def sample(self, now: Optional[float] = None) -> None:
+        """Append one record per open cube (and forget closed ones)."""
+        now = time.time() if now is None else now
+        mono = time.monotonic()
+        seen = set()
+        for device, ctrl in self.registry.items():
+            seen.add(device)
+            try:
+                st = ctrl.status
+                record = (now, int(st.get("position", 0)), float(st.get("velocity", 0.0)), pack_flags(st))
+            except Exception as e:                     # cube vanished mid‑read
+                log.debug("Telemetry sample of %s failed: %s", device, e)
+                continue
+            ring = self.rings.get(device)
+            if ring is None:
+                ring = self.rings[device] = Ring(int(self.rate * self.seconds))
+            ring.append(*record, mono=mono)
+            for fn in self._listeners:
+                try:
+                    fn(device, record)
+                except Exception as e:
+                    log.warning("Telemetry listener failed: %s", e)
+        for device in set(self.rings) - seen:
+            del self.rings[device]
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        period = 1.0 / self.rate
+        due = loop.time()
+        while True:
+            self.sample()
+            due += period                              # fixed schedule, no drift
+            delay = due - loop.time()
+            if delay < 0:                              # fell behind – skip, don't burst
+                due, delay = loop.time(), 0
+            await asyncio.sleep(delay)
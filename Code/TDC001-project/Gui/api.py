@@ -1,9 +1,20 @@
+import asyncio
+import errno
+import ipaddress
+import json
+import os
+import queue
 import socket
-from concurrent.futures import ThreadPoolExecutor, as_completed
-from typing import List, Optional
+import threading
+from urllib.parse import quote, urlsplit
+from typing import AsyncIterator, Iterable, Iterator, List, Optional, Tuple
 import requests
+from websockets.sync.client import connect as ws_connect
 
-__all__ = ["APIClient", "scan_for_backends"]
+__all__ = [
+    "APIClient", "StatusSubscription", "discover_backends", "scan_for_backends", "default_cidrs",
+    "beacon_backends", "listen_for_backends",
+]
 
 # ---------------------------------------------------------------------------
 # Low‑level REST wrapper ------------------------------------------------------
@@ -37,15 +48,139 @@ class APIClient:
     def status(self) -> dict:               return self._req("GET",  "/status")
     def connect(self, port: str):           return self._req("POST", "/connect",  json={"port": port})
     def move_rel(self, steps: int):         return self._req("POST", "/move_rel", json={"steps": steps},    timeout=150)
-    def move_abs(self, position: int):      return self._req("POST", "/move_abs", json={"position": position}, timeout=150)
+    def move_abs(self, position: int, retarget: bool = False):
+        """Absolute move; ``retarget=True`` replaces a running retarget move (it answers "superseded")."""
+        body = {"position": position, "retarget": True} if retarget else {"position": position}
+        return self._req("POST", "/move_abs", json=body, timeout=150)
     def home(self):                         return self._req("POST", "/home",     timeout=120)
     def flash(self):                        return self._req("POST", "/identify")
     def stop(self):                         return self._req("POST", "/stop")
 
+    def status_since(self, since: int, wait: float = 25.0) -> dict:
+        """Long-poll: ``{"version", "status"}`` once the cube changes after *since*, ``{}`` if *wait* expires.
+
+        Backends without long-poll ignore the parameters and answer a plain status dict.
+        """
+        return self._req("GET", "/status", params={"since": since, "wait": wait}, timeout=wait + 5)
+
+    def status_all(self, since: Optional[int] = None) -> dict:
+        """Every cube's status; with *since* only what changed ({} if nothing did)."""
+        return self._req("GET", "/status/all", params={} if since is None else {"since": since})
+
+    def group_move(self, axes: List[dict]):
+        """Move several cubes together: ``[{"device": serial, "position"|"steps": n}, ...]``."""
+        return self._req("POST", "/group_move", json={"axes": axes}, timeout=150)
+
+    def subscribe_status(self, device: Optional[str] = None, max_rate: float = 20.0) -> "StatusSubscription":
+        """Open a push stream of status updates (see :class:`StatusSubscription`)."""
+        return StatusSubscription(self.base, device, max_rate)
+
+    def jog_session(self, device: Optional[str] = None, deadman: float = 0.5) -> "JogSession":
+        """Hold‑to‑move helper for the backend's ``/ws/jog`` (see :class:`JogSession`)."""
+        return JogSession(self.base, device, deadman)
+
+# ---------------------------------------------------------------------------
+# Push status stream ----------------------------------------------------------
+# ---------------------------------------------------------------------------
+
+class StatusSubscription:
+    """Iterate over full status dicts pushed by the backend's ``/ws/status``.
+
+    The server sends one snapshot and then only changed fields; this class
+    merges them so every yielded dict looks exactly like ``GET /status``.
+    Iteration blocks, so run it on a worker thread and call :meth:`close`
+    from anywhere to end it.
+    """
+
+    def __init__(self, base_url: str, device: Optional[str] = None, max_rate: float = 20.0):
+        url = "ws" + base_url.rstrip("/")[len("http"):] + "/ws/status"
+        params = [f"max_rate={max_rate:g}"]
+        if device:
+            params.append(f"device={quote(device, safe='')}")
+        self.url = f"{url}?{'&'.join(params)}"
+        self._ws = None
+        self._closed = False
+
+    def __iter__(self) -> Iterator[dict]:
+        status: dict = {}
+        with ws_connect(self.url, open_timeout=3) as ws:
+            self._ws = ws
+            if self._closed:                    # close() raced the handshake
+                return
+            for raw in ws:
+                msg = json.loads(raw)
+                if msg["type"] == "snapshot":
+                    status = dict(msg["status"])
+                else:
+                    status.update(msg["changes"])
+                yield dict(status)
+
+    def close(self) -> None:
+        self._closed = True
+        if self._ws is not None:
+            self._ws.close()
+
+# ---------------------------------------------------------------------------
+# Hold-to-move (continuous jog) -----------------------------------------------
+# ---------------------------------------------------------------------------
+
+class JogSession:
+    """Run the cube at constant speed for as long as a button is held.
+
+    :meth:`start` opens ``/ws/jog`` on a background thread, starts the
+    motion and then sends a heartbeat every third of *deadman*; the backend
+    stops the cube by itself if the heartbeats stop (GUI frozen, network
+    gone).  :meth:`set_velocity` changes speed mid‑motion, :meth:`release`
+    stops.  None of them block.  A connection error ends up in ``error``.
+    """
+
+    def __init__(self, base_url: str, device: Optional[str] = None, deadman: float = 0.5):
+        url = "ws" + base_url.rstrip("/")[len("http"):] + "/ws/jog"
+        params = [f"deadman={deadman:g}"]
+        if device:
+            params.append(f"device={quote(device, safe='')}")
+        self.url = f"{url}?{'&'.join(params)}"
+        self.deadman = deadman
+        self.error: Optional[Exception] = None
+        self._outbox: "queue.SimpleQueue[dict]" = queue.SimpleQueue()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self, direction: str, velocity: Optional[float] = None) -> None:
+        """Begin moving towards *direction* ("forward"/"reverse") at *velocity* counts/s."""
+        self._outbox.put({"type": "jog", "direction": direction, "velocity": velocity})
+        self._thread = threading.Thread(target=self._run, name="tdc-jog", daemon=True)
+        self._thread.start()
+
+    def set_velocity(self, velocity: float) -> None:
+        self._outbox.put({"type": "jog", "velocity": velocity})
+
+    def release(self) -> None:
+        """Stop the motion and close the connection."""
+        self._outbox.put({"type": "stop"})
+
+    def _run(self) -> None:
+        try:
+            with ws_connect(self.url, open_timeout=3) as ws:
+                while True:
+                    try:                        # commands go out at once …
+                        msg = self._outbox.get(timeout=self.deadman / 3)
+                    except queue.Empty:         # … silence means "still holding"
+                        msg = {"type": "heartbeat"}
+                    ws.send(json.dumps(msg))
+                    if msg["type"] == "stop":
+                        return
+        except Exception as e:              # backend gone → its deadman stops the cube
+            self.error = e
+
 # ---------------------------------------------------------------------------
 # LAN discovery helper --------------------------------------------------------
 # ---------------------------------------------------------------------------
 
+# Subnets swept when the caller gives none (besides our own /24); override
+# with a comma‑separated TDC_SCAN_CIDRS, e.g. "10.1.4.0/24,192.168.7.0/24".
+LEGACY_CIDRS = ("192.168.0.0/24", "192.168.2.0/24", "10.0.0.0/24")
+
+
 def _is_backend(url: str, timeout: float) -> Optional[str]:
     """Return *url* if it hosts a TDC001 backend, else ``None``."""
     try:
@@ -58,50 +193,263 @@ def _is_backend(url: str, timeout: float) -> Optional[str]:
     return None
 
 
-def scan_for_backends(port: int = 8000, timeout: float = 0.25, workers: int = 64) -> List[str]:
-    """Return a *deduplicated* list of reachable **TDC001** backends on the LAN.
+def _local_ip() -> Optional[str]:
+    """IP of the interface that routes to the internet (no packet is sent)."""
+    s = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    try:
+        s.connect(("8.8.8.8", 80))
+        return s.getsockname()[0]
+    except OSError:
+        return None                         # offline laptop → skip own subnet
+    finally:
+        s.close()
 
-    Strategy (mirrors rock‑solid v1.8 behaviour):
-    1.  Check well‑known hosts: ``127.0.0.1`` and ``host.docker.internal`` (if resolvable).
-    2.  Probe our own /24 subnet – cheap and reliable in most labs.
-    3.  Fall‑back scan of the common lab nets ``192.168.0.*``, ``192.168.1.*`` and ``10.0.0.*``.
 
-    Each candidate is verified via ``GET /ping`` → must return
-    ``{"backend": "TDC001"}`` to be accepted.  This prevents the GUI from
-    clogging the dropdown with random port‑8000 servers or gateways.
+def default_cidrs() -> List[str]:
+    """Own /24 first, then ``TDC_SCAN_CIDRS`` (or :data:`LEGACY_CIDRS`)."""
+    cidrs: List[str] = []
+    ip = _local_ip()
+    if ip:
+        cidrs.append(str(ipaddress.ip_network(f"{ip}/24", strict=False)))
+    env = os.getenv("TDC_SCAN_CIDRS")
+    if env:
+        cidrs.extend(c.strip() for c in env.split(",") if c.strip())
+    else:
+        cidrs.extend(LEGACY_CIDRS)
+    return cidrs
+
+
+def _candidate_hosts(cidrs: Iterable[str]) -> List[str]:
+    hosts = ["127.0.0.1", "host.docker.internal"]           # well‑known first
+    for cidr in cidrs:
+        hosts.extend(str(h) for h in ipaddress.ip_network(cidr, strict=False).hosts())
+    return list(dict.fromkeys(hosts))                       # dedupe, keep order
+
+
+class _AdaptiveLimit:
+    """Semaphore whose size grows while probes succeed and halves when the
+    OS runs out of sockets/file descriptors (additive increase,
+    multiplicative decrease)."""
+
+    def __init__(self, start: int, ceiling: int, floor: int = 8):
+        self.limit, self.ceiling, self.floor = min(start, ceiling), ceiling, floor
+        self._in_use = 0
+        self._ok = 0
+        self._cond = asyncio.Condition()
+
+    async def __aenter__(self):
+        async with self._cond:
+            await self._cond.wait_for(lambda: self._in_use < self.limit)
+            self._in_use += 1
+
+    async def __aexit__(self, *exc):
+        async with self._cond:
+            self._in_use -= 1
+            self._cond.notify_all()
+
+    def success(self) -> None:
+        self._ok += 1
+        if self._ok >= self.limit and self.limit < self.ceiling:   # one clean "round"
+            self._ok, self.limit = 0, min(self.ceiling, self.limit + 32)
+
+    def backoff(self) -> None:
+        self._ok, self.limit = 0, max(self.floor, self.limit // 2)
+
+
+def _fd_ceiling() -> int:
+    """Concurrency we can afford: half the soft open‑file limit (POSIX)."""
+    try:
+        import resource
+        soft, _ = resource.getrlimit(resource.RLIMIT_NOFILE)
+        return max(16, min(1024, soft // 2))
+    except (ImportError, ValueError, OSError):   # Windows → select() caps at ~512
+        return 256
+
+
+_RESOURCE_ERRNOS = {errno.EMFILE, errno.ENFILE, errno.ENOBUFS, errno.EAGAIN}
+
+
+async def _read_response(reader: asyncio.StreamReader, cap: int = 65536) -> bytes:
+    """Read until the server closes (``Connection: close``) or *cap* bytes."""
+    raw = b""
+    while len(raw) < cap:
+        chunk = await reader.read(4096)
+        if not chunk:
+            break
+        raw += chunk
+    return raw
+
+
+async def _probe(host: str, port: int, limit: _AdaptiveLimit,
+                 connect_timeout: float, ping_timeout: float) -> Optional[Tuple[str, float]]:
+    """TCP connect first; only hosts that accept get a raw ``GET /ping``.
+
+    Returns ``(url, round‑trip ms)`` for a TDC001 backend, else ``None``.
     """
-    hosts: List[str] = []
+    loop = asyncio.get_running_loop()
+    for _ in range(3):                                  # retry after resource back‑off
+        async with limit:
+            t0 = loop.time()
+            try:
+                reader, writer = await asyncio.wait_for(asyncio.open_connection(host, port), connect_timeout)
+            except OSError as e:
+                if e.errno in _RESOURCE_ERRNOS:
+                    limit.backoff()
+                    continue
+                return None                             # refused / unreachable / no DNS
+            except asyncio.TimeoutError:
+                limit.success()                         # silent host – the normal case
+                return None
+            limit.success()
+            try:
+                writer.write(f"GET /ping HTTP/1.1\r\nHost: {host}:{port}\r\nConnection: close\r\n\r\n".encode())
+                raw = await asyncio.wait_for(_read_response(reader), ping_timeout)
+                head, _, body = raw.partition(b"\r\n\r\n")
+                lines = head.decode("latin-1").lower().split("\r\n")
+                if lines[0].split()[1:2] != ["200"] or not any(
+                        l.startswith("content-type: application/json") for l in lines):
+                    return None
+                if json.loads(body).get("backend") == "TDC001":
+                    return f"http://{host}:{port}", round((loop.time() - t0) * 1000, 2)
+            except (OSError, asyncio.TimeoutError, ValueError, IndexError, AttributeError):
+                pass                                    # port 8000 but not us
+            finally:
+                writer.close()
+            return None
+    return None
+
+
+# ─── UDP beacon (see the backend's tdc_beacon.py) ──────────────────────────
+
+BEACON_GROUP = "239.255.80.1"
+
+
+class _BeaconClient(asyncio.DatagramProtocol):
+    def __init__(self, queue: "asyncio.Queue[tuple]"):
+        self.queue = queue
+
+    def datagram_received(self, data: bytes, addr) -> None:
+        self.queue.put_nowait((data, addr))
+
+
+async def beacon_backends(port: int = 8000, window: float = 0.5) -> AsyncIterator[dict]:
+    """Ask every backend on the LAN over UDP; yield replies for *window* seconds.
 
-    # ① canonical localhost variants -------------------------------------------------
-    hosts.extend(["127.0.0.1"])  # always valid
+    One datagram goes to the broadcast address, the multicast group and
+    localhost.  Each yielded dict is the backend's reply plus ``"url"``
+    (from ``TDC_PUBLIC_URL`` or the address the reply came from) and
+    ``"rtt_ms"``.
+    """
+    loop = asyncio.get_running_loop()
+    queue: "asyncio.Queue[tuple]" = asyncio.Queue()
+    sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM, socket.IPPROTO_UDP)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_BROADCAST, 1)
+    sock.bind(("", 0))
+    sock.setblocking(False)
+    transport, _ = await loop.create_datagram_endpoint(lambda: _BeaconClient(queue), sock=sock)
     try:
-        socket.gethostbyname("host.docker.internal")
-        hosts.append("host.docker.internal")
-    except socket.gaierror:
-        pass  # not defined on this platform → ignore
+        query = json.dumps({"type": "discover", "backend": "TDC001"}).encode()
+        for dest in ("255.255.255.255", BEACON_GROUP, "127.0.0.1"):
+            try:
+                transport.sendto(query, (dest, port))
+            except OSError:
+                pass                                    # e.g. no route for broadcast
+        seen = set()
+        sent = loop.time()
+        deadline = sent + window
+        while (remaining := deadline - loop.time()) > 0:
+            try:
+                data, addr = await asyncio.wait_for(queue.get(), remaining)
+            except asyncio.TimeoutError:
+                break
+            try:
+                msg = json.loads(data)
+            except ValueError:
+                continue
+            if not isinstance(msg, dict) or msg.get("backend") != "TDC001":
+                continue
+            msg["url"] = msg.get("url") or f"http://{addr[0]}:{msg.get('http_port', 8000)}"
+            msg["rtt_ms"] = round((loop.time() - sent) * 1000, 2)
+            if msg["url"] not in seen:
+                seen.add(msg["url"])
+                yield msg
+    finally:
+        transport.close()
+
+
+def listen_for_backends(port: int = 8000, window: float = 0.5) -> List[dict]:
+    """Blocking wrapper around :func:`beacon_backends`."""
+    async def collect() -> List[dict]:
+        return [m async for m in beacon_backends(port, window)]
+    return asyncio.run(collect())
+
 
-    # ② our own /24 -------------------------------------------------------------------
+async def discover_backends(
+    cidrs: Optional[Iterable[str]] = None,
+    port: int = 8000,
+    *,
+    connect_timeout: float = 0.3,
+    ping_timeout: float = 1.0,
+    concurrency: int = 256,
+    beacon: bool = True,
+    known: Iterable[str] = (),
+) -> AsyncIterator[Tuple[str, float]]:
+    """Yield ``(url, round‑trip ms)`` for TDC001 backends *as they are found*.
+
+    *known* URLs (e.g. from the discovery cache) are re‑checked first, so
+    backends we have seen before show up after a single round trip.  With
+    *beacon* the UDP query (:func:`beacon_backends`) runs alongside the
+    sweep, so backends on subnets we would never sweep still turn up.  Every
+    address in *cidrs* (default: :func:`default_cidrs`) plus
+    ``127.0.0.1`` and ``host.docker.internal`` gets a cheap TCP connect with
+    *connect_timeout*; only hosts that accept are asked ``GET /ping``, and
+    only those answering ``{"backend": "TDC001"}`` are yielded.  Up to
+    *concurrency* probes run at once; the limit grows towards the OS file
+    descriptor budget and halves if sockets run out.
+    """
+    targets = [_host_port(u) for u in known]            # first in line for a slot
+    targets += [(h, port) for h in _candidate_hosts(default_cidrs() if cidrs is None else cidrs)]
+    limit = _AdaptiveLimit(concurrency, max(concurrency, _fd_ceiling()))
+    tasks = [asyncio.ensure_future(_probe(h, p, limit, connect_timeout, ping_timeout))
+             for h, p in dict.fromkeys(targets)]
+    if beacon:
+        tasks.append(asyncio.ensure_future(_beacon_hits(port)))
+    seen = set()
     try:
-        s = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
-        s.connect(("8.8.8.8", 80))
-        local_ip = s.getsockname()[0]
+        for fut in asyncio.as_completed(tasks):
+            result = await fut
+            for hit in result if isinstance(result, list) else [result]:
+                if hit and hit[0] not in seen:
+                    seen.add(hit[0])
+                    yield hit
     finally:
-        s.close()
-    prefix = ".".join(local_ip.split(".")[:3])
-    hosts.extend(f"{prefix}.{i}" for i in range(1, 255))
-
-    # ③ common lab sub‑nets ------------------------------------------------------------
-    hosts.extend(f"192.168.{sub}.{i}" for sub in (0, 2) for i in range(1, 255))
-    hosts.extend(f"10.0.0.{i}" for i in range(1, 255))
-
-    # ─── probe candidates concurrently ─────────────────────────────────────────
-    urls = [f"http://{h}:{port}" for h in dict.fromkeys(hosts)]  # dedupe early
-    found: List[str] = []
-    with ThreadPoolExecutor(max_workers=workers) as ex:
-        futures = [ex.submit(_is_backend, u, timeout) for u in urls]
-        for f in as_completed(futures):
-            hit = f.result()
-            if hit and hit not in found:
-                found.append(hit)
-    return found
+        for t in tasks:                                 # consumer stopped early
+            t.cancel()
+
 
+def _host_port(url: str) -> Tuple[str, int]:
+    parts = urlsplit(url)
+    return parts.hostname or "", parts.port or 80
+
+
+async def _beacon_hits(port: int) -> List[Tuple[str, float]]:
+    try:
+        return [(m["url"], m["rtt_ms"]) async for m in beacon_backends(port)]
+    except OSError:
+        return []                                       # no UDP – the sweep still runs
+
+
+def scan_for_backends(
+    port: int = 8000,
+    timeout: float = 0.3,
+    cidrs: Optional[Iterable[str]] = None,
+) -> List[str]:
+    """Blocking wrapper around :func:`discover_backends`; returns all URLs found.
+
+    Each candidate is verified via ``GET /ping`` → must return
+    ``{"backend": "TDC001"}`` to be accepted.  This prevents the GUI from
+    clogging the dropdown with random port‑8000 servers or gateways.
+    """
+    async def collect() -> List[str]:
+        return [u async for u, _ in discover_backends(cidrs, port, connect_timeout=timeout)]
+    return asyncio.run(collect())
@@ -21,17 +21,19 @@ from PyQt6.QtWidgets import (
 )
 from PyQt6.QtCore import QTimer, QThread
 
-from api import APIClient, scan_for_backends
+from api import APIClient, discover_backends, _is_backend
 from constants import STEP_PRESETS, UNIT_FACT
-from storage import load_positions, save_positions, load_settings, save_settings
+from storage import (
+    load_positions, save_positions, load_settings, save_settings, load_backends, save_backends
+)
 from popups import ask_restore_session, ask_restore_preset, warn_lost_power, warn_moved
-from task_runner import Worker
+from task_runner import StatusStreamWorker, DiscoveryWorker, StatusPoller, CommandExecutor
 
 
 class MainWindow(QMainWindow):
     """Main UI class with boot-time session restore and safe-state checks."""
 
-    def __init__(self, backend_hint=None):
+    def __init__(self, backend_hint=None, scan_cidrs=None):
         super().__init__()
         # Window setup
         self.setWindowTitle("Thorlabs TDC001 Controller")
@@ -43,19 +45,27 @@ class MainWindow(QMainWindow):
         self.steps_per_mm = STEP_PRESETS["T-Cube 0.5 mm lead"]
         self.positions = load_positions()      # { "backend|port": {pos, time, steps_per_mm, homed} }
         self.settings = load_settings()        # { backend, port, preset, steps_per_mm, date }
+        self.backends = load_backends()        # { url: {last_seen, rtt_ms} } from earlier scans
         self.session_restored = False
         self._did_post_connect_warn = False
+        self._stream = None                    # (QThread, StatusStreamWorker) while pushing
+        self._discovery = None                 # (QThread, DiscoveryWorker) while scanning
+        self._executors = {}                   # backend URL → CommandExecutor
+        self._jog = None                       # api.JogSession while a hold button is down
+        self._last_status = None               # latest status from the poller / push stream
+        self._save_key = None                  # "backend|port" whose idle position we may save
+        self._restore_port = None              # session restore: port to pick once ports arrive
+        self._restore_offered = False          # session-restore prompt shown (or moot)
+        self.scan_cidrs = scan_cidrs           # None → own /24 + TDC_SCAN_CIDRS / defaults
 
         # Input validators
         self.int_val = QIntValidator(1, 10**6, self)
         self.fl_val  = QDoubleValidator(0.0, 1e6, 6, self)
 
-        # Build UI, discover backends, restore session, start polling
+        # Build UI, start status poller, discover backends, restore session
         self._build_ui()
+        self._start_poller()
         self._discover_backends(backend_hint)
-        self._status_timer = QTimer(self)
-        self._status_timer.timeout.connect(self._refresh_status)
-        self._status_timer.start(500)
         self._maybe_restore_session()
 
     def _maybe_restore_session(self):
@@ -73,13 +83,14 @@ class MainWindow(QMainWindow):
         saved_spm     = self.settings.get("steps_per_mm", self.steps_per_mm)
         saved_date    = self.settings.get("date", "")
 
-        # nothing to restore?
-        if not (saved_backend and saved_port):
+        # nothing to restore (or already asked)?
+        if self._restore_offered or not (saved_backend and saved_port):
             return
 
-        # backend must still be in our dropdown
+        # backend must be in our dropdown (discovery may add it later)
         if self.cmb_backend.findText(saved_backend) < 0:
             return
+        self._restore_offered = True
 
         # ask the user
         if not ask_restore_session(
@@ -95,14 +106,7 @@ class MainWindow(QMainWindow):
         # mark that we *have* just done a boot-restore
         self.session_restored = True
 
-        # 1) pick the saved backend & reload ports
-        self.cmb_backend.setCurrentText(saved_backend)
-        self._on_backend_change(saved_backend)
-
-        # 2) pick the saved port
-        self.cmb_port.setCurrentText(saved_port)
-
-        # 3) restore the preset (or custom)
+        # 1) restore the preset (or custom)
         if saved_preset in STEP_PRESETS:
             self.cmb_preset.setCurrentText(saved_preset)
         else:
@@ -110,25 +114,14 @@ class MainWindow(QMainWindow):
             self.cmb_preset.setCurrentText("Custom")
             self.ed_steps.setText(str(saved_spm))
 
-        # 4) call your existing preset handler so everything stays in sync
+        # 2) call your existing preset handler so everything stays in sync
         self._on_preset(self.cmb_preset.currentText())
 
-        # 5) connect the device (this also saves the settings again)
-        self._connect_device()
-
-        # 6) do one immediate status refresh to avoid flicker
-        self._refresh_status()
-
-        # 7) auto‐move back to the last saved absolute position
-        key = f"{self.api.base}|{saved_port}"
-        last = self.positions.get(key)
-        if last and "pos" in last:
-            # no need to QTimer this if you don't mind the slight delay
-            QTimer.singleShot(200, lambda: self._run_async(self.api.move_abs, last["pos"]))
-
-        # 8) schedule your lost‐power / moved‐elsewhere safety check
-        self._did_post_connect_warn = False
-        QTimer.singleShot(500, self._check_post_connect)
+        # 3) pick the saved backend; its ports load in the background and
+        #    _on_ports / _on_connected pick the saved port, connect and move back
+        self._restore_port = saved_port
+        self.cmb_backend.setCurrentText(saved_backend)
+        self._on_backend_change(saved_backend)
 
     def _connect_device(self):
         """
@@ -138,15 +131,14 @@ class MainWindow(QMainWindow):
         - Schedules lost-power/moved warnings once device is idle
         """
         port = self.cmb_port.currentText().strip()
-        if not port:
+        if not port or not self.api:
             return
+        self.statusbar.showMessage("Connecting...", 2000)
+        self._submit("connect", port)             # → _on_connected (queued like any command)
 
-        try:
-            self.api.connect(port)
-            self.statusbar.showMessage("Connected", 2000)
-        except Exception as e:
-            QMessageBox.critical(self, "Error", f"/connect failed:\n{e}")
-            return
+    def _on_connected(self, port):
+        """/connect succeeded: save the session, start the status stream, finish a restore."""
+        self.statusbar.showMessage("Connected", 2000)
 
         # Persist connection settings for next boot
         self.settings.update({
@@ -158,32 +150,136 @@ class MainWindow(QMainWindow):
         })
         save_settings(self.settings)
 
+        # Take the saved position *before* any status of this cube comes in
+        # and stop saving until the safety check has compared the two –
+        # earlier statuses may even belong to the backend's previous cube.
+        key  = f"{self.api.base}|{port}"
+        last = self.positions.get(key)
+        self._save_key = None
+        self._last_status = None
+        self._poller.set_backend(self.api.base)  # drop in-flight replies, re-emit the current status
+
         # Reset warning guard and schedule safety check
         self._did_post_connect_warn = False
-        QTimer.singleShot(500, self._check_post_connect)
+        QTimer.singleShot(500, lambda: self._check_post_connect(key, last))
+
+        # Prefer pushed status over polling for this cube
+        self._start_stream(port)
+
+        # Session restore: move back to the last saved absolute position
+        if self._restore_port == port:
+            self._restore_port = None
+            if last and "pos" in last:
+                self._submit("move_abs", last["pos"])
 
-    def _check_post_connect(self):
+    def _start_stream(self, port):
         """
-        After connecting:
-        1) If busy (initializing/moving), retry in 200 ms
+        Subscribe to the backend's /ws/status push stream for *port*.
+        While it is alive the status poller is paused; if the stream
+        fails (old backend, network drop) we fall back to polling.
+        """
+        self._stop_stream()
+        worker = StatusStreamWorker(self.api.subscribe_status(port, max_rate=20))
+        thread = QThread(self)
+        worker.moveToThread(thread)
+        thread.started.connect(worker.run)
+        worker.status.connect(self._apply_status)
+        worker.finished.connect(self._on_stream_end)  # bound method → runs on the GUI thread
+        self._stream = (thread, worker)
+        self._poller.pause("stream")
+        thread.start()
+
+    def _stop_stream(self):
+        """Close the push stream (if any); _on_stream_end resumes polling."""
+        if self._stream:
+            thread, worker = self._stream
+            worker.stop()
+
+    def _on_stream_end(self, err):
+        """Clean up the stream thread and go back to polling."""
+        worker = self.sender()
+        thread = worker.thread()
+        thread.quit()
+        thread.wait()
+        worker.deleteLater()
+        thread.deleteLater()
+        if self._stream and self._stream[0] is thread:
+            self._stream = None
+            if err:
+                self.statusbar.showMessage(f"Status stream lost, polling instead: {err}", 4000)
+        if not self._stream:
+            self._poller.resume("stream")
+
+    def _start_poller(self):
+        """
+        One long-lived background poller: fast while moving, slow when idle,
+        signals only on change – a slow backend can never freeze the window.
+        """
+        self._poller = StatusPoller()
+        self._poller_thread = QThread(self)
+        self._poller.moveToThread(self._poller_thread)
+        self._poller_thread.started.connect(self._poller.run)
+        self._poller.status.connect(self._apply_status)
+        self._poller.error.connect(self._on_status_error)
+        self._poller_thread.start()
+
+    def _on_status_error(self, err):
+        self.lbl_status.setText(f"Status: ⚠ {err}")
+
+    def showEvent(self, event):
+        """Poll only while the window is visible."""
+        self._poller.resume("hidden")
+        super().showEvent(event)
+
+    def hideEvent(self, event):
+        self._poller.pause("hidden")
+        super().hideEvent(event)
+
+    def closeEvent(self, event):
+        """Stop the poller, command queues, push stream and any running scan before the window goes away."""
+        self._jog_release()
+        for ex in self._executors.values():
+            ex.shutdown()
+        self._poller.stop()
+        self._poller_thread.quit()
+        self._poller_thread.wait(4000)
+        for attr in ("_stream", "_discovery"):
+            if getattr(self, attr):
+                thread, worker = getattr(self, attr)
+                setattr(self, attr, None)
+                worker.stop()
+                thread.quit()
+                thread.wait(2000)
+        super().closeEvent(event)
+
+    def _check_post_connect(self, key, last):
+        """
+        After connecting to *key* ("backend|port"), whose saved entry was
+        *last* at connect time:
+        1) If busy (initializing/moving) or no status yet, retry in 200 ms
         2) Once idle and not yet warned:
            • If previously homed but now un-homed → lost-power
            • Else if homed and position differs → moved-elsewhere
+        Positions are saved again (_apply_status) only once this is done.
         """
-        port = self.cmb_port.currentText().strip()
-        key  = f"{self.api.base}|{port}"
-        last = self.positions.get(key)
+        if not self.api or key != f"{self.api.base}|{self.cmb_port.currentText().strip()}":
+            return                                # reconnected elsewhere meanwhile
         if not last or self._did_post_connect_warn:
+            self._save_key = key
             return
 
-        st = self.api.status()
+        st = self._last_status                    # from the poller / stream – never block here
+        if st is None:
+            self._poller.poke()
+            QTimer.singleShot(200, lambda: self._check_post_connect(key, last))
+            return
         curr_pos   = st["position"]
         curr_homed = st["homed"]
         busy = st["moving_forward"] or st["moving_reverse"]
 
         # Retry if still busy
         if busy:
-            QTimer.singleShot(200, self._check_post_connect)
+            QTimer.singleShot(200, lambda: self._check_post_connect(key, last))
             return
 
         # Fetch saved data
@@ -197,22 +293,18 @@ class MainWindow(QMainWindow):
         if last_homed and not curr_homed:
             self._did_post_connect_warn = True
             if warn_lost_power(self, last_pos, last_mm, last_time):
-                def after_home(res, err):
-                    if not err:
-                        self._run_async(self.api.move_abs, last_pos)
-                w = Worker(self.api.home)
-                t = QThread(self)
-                w.moveToThread(t)
-                t.started.connect(w.run)
-                w.finished.connect(after_home)
-                t.start()
+                # queued in order; if homing fails the move is discarded
+                self._submit("home")
+                self._submit("move_abs", last_pos)
 
         # Moved-elsewhere case
         if curr_homed and abs(curr_pos - last_pos) > 2:
             self._did_post_connect_warn = True
             curr_mm = curr_pos / self.steps_per_mm
             if warn_moved(self, last_pos, curr_pos, last_mm, curr_mm, last_time):
-                self._run_async(self.api.move_abs, last_pos)
+                self._submit("move_abs", last_pos)
+
+        self._save_key = key                      # checked – keep the saved position current again
 
     def _build_ui(self):
         """Construct all widgets, layouts, and connect signals."""
@@ -302,37 +394,83 @@ class MainWindow(QMainWindow):
         btn_go = QPushButton("Go to absolute"); btn_go.clicked.connect(self._move_abs)
         grid.addWidget(btn_go, 2, 3, 1, 2)
 
+        # Hold-to-move: runs at constant speed while the button is held
+        grid.addWidget(QLabel("Hold to move (mm/s):"), 3, 0)
+        self.ed_jog = QLineEdit("0.5"); self.ed_jog.setValidator(self.fl_val)
+        grid.addWidget(self.ed_jog, 3, 1, 1, 2)
+        btn_jog_rev = QPushButton("◀ hold"); btn_jog_rev.pressed.connect(lambda: self._jog_start("reverse"))
+        btn_jog_fwd = QPushButton("hold ▶"); btn_jog_fwd.pressed.connect(lambda: self._jog_start("forward"))
+        for btn in (btn_jog_rev, btn_jog_fwd):
+            btn.released.connect(self._jog_release)
+        grid.addWidget(btn_jog_rev, 3, 3); grid.addWidget(btn_jog_fwd, 3, 4)
+
         # Control buttons
-        btn_home = QPushButton("Home");  btn_home.clicked.connect(lambda: self._run_async(self.api.home))
-        btn_flash = QPushButton("Flash"); btn_flash.clicked.connect(lambda: self._run_async(self.api.flash))
+        btn_home = QPushButton("Home");  btn_home.clicked.connect(lambda: self._submit("home"))
+        btn_flash = QPushButton("Flash"); btn_flash.clicked.connect(lambda: self._submit("flash"))
         btn_stop = QPushButton("STOP")
         btn_stop.setStyleSheet("background:#d9534f;color:white;font-weight:bold;")
-        btn_stop.clicked.connect(lambda: self._run_async(self.api.stop))
-        grid.addWidget(btn_home, 3, 0); grid.addWidget(btn_flash, 3, 1)
-        grid.addWidget(btn_stop, 3, 2, 1, 3)
+        btn_stop.clicked.connect(self._stop)
+        grid.addWidget(btn_home, 4, 0); grid.addWidget(btn_flash, 4, 1)
+        grid.addWidget(btn_stop, 4, 2, 1, 3)
 
         main_v.addWidget(mot_g)
         main_v.addStretch()
 
-        # Status bar
+        # Status bar (+ command queue depth on the right)
         self.statusbar = QStatusBar(self)
         self.setStatusBar(self.statusbar)
+        self.lbl_queue = QLabel("")
+        self.statusbar.addPermanentWidget(self.lbl_queue)
 
     # main_window.py
     def _discover_backends(self, hint=None):
         """Populate backend dropdown with *verified* TDC001 servers only."""
+        self.cmb_backend.clear()
         if hint and hint != "auto":
             # Still verify the user-supplied hint so we don’t crash later
-            candidates = [hint] if _is_backend(hint, 0.3) else []
-        else:
-            candidates = scan_for_backends()          # already does localhost + host.docker.internal + LAN
+            if _is_backend(hint, 0.3):
+                self.cmb_backend.addItem(hint)    # fires _on_backend_change
+            return
 
-        self.cmb_backend.clear()
-        for url in candidates:
-            self.cmb_backend.addItem(url)
+        # Scan in the background; backends show up in the dropdown one by one.
+        # Cached backends are re-checked first (fastest first), so the usual
+        # lab setup is usable after a single round trip.
+        known = sorted(self.backends, key=lambda u: self.backends[u].get("rtt_ms", 1e9))
+        worker = DiscoveryWorker(discover_backends(self.scan_cidrs, known=known))
+        thread = QThread(self)
+        worker.moveToThread(thread)
+        thread.started.connect(worker.run)
+        worker.found.connect(self._on_backend_found)
+        worker.finished.connect(self._on_discovery_end)
+        self._discovery = (thread, worker)
+        self.statusbar.showMessage("Searching for backends...")
+        thread.start()
 
-        if self.cmb_backend.count():
-            self._on_backend_change(self.cmb_backend.currentText())
+    def _on_backend_found(self, url, rtt_ms):
+        """Add a freshly discovered backend; the first one becomes current."""
+        self.backends[url] = {"last_seen": datetime.datetime.now().isoformat(), "rtt_ms": rtt_ms}
+        if self.cmb_backend.findText(url) < 0:
+            self.cmb_backend.addItem(url)         # first item fires _on_backend_change
+        if url == self.settings.get("backend"):
+            self._maybe_restore_session()         # saved backend just turned up
+
+    def _on_discovery_end(self, err):
+        """Clean up the scan thread and report what was found."""
+        worker = self.sender()
+        thread = worker.thread()
+        thread.quit()
+        thread.wait()
+        worker.deleteLater()
+        thread.deleteLater()
+        if self._discovery and self._discovery[0] is thread:
+            self._discovery = None
+        save_backends(self.backends)              # one write per scan
+        if not self.api:
+            self._refresh_status()                # show "no backend"
+        if err:
+            self.statusbar.showMessage(f"Backend scan failed: {err}", 4000)
+        else:
+            self.statusbar.showMessage(f"Found {self.cmb_backend.count()} backend(s)", 2000)
 
     def _add_backend(self):
         """Save user-typed backend URL into dropdown."""
@@ -345,16 +483,25 @@ class MainWindow(QMainWindow):
         """When backend changes, fetch available cube-ports."""
         if not url:
             return
+        self._stop_stream()
+        self._jog_release()
         self.api = APIClient(url)
+        self._poller.set_backend(url)
+        self._last_status = None
+        self._save_key = None
         self.statusbar.showMessage("Loading ports...", 2000)
-        try:
-            ports = self.api.list_ports()
-        except Exception as e:
-            QMessageBox.critical(self, "Error", f"/ports failed:\n{e}")
-            ports = []
+        self._submit("list_ports")                # → _on_ports
+
+    def _on_ports(self, ports):
+        """Fill the port dropdown and connect the saved (restore) or first port."""
+        self.cmb_port.blockSignals(True)          # one connect below, not one per item
         self.cmb_port.clear()
         self.cmb_port.addItems(ports)
+        if self._restore_port in ports:
+            self.cmb_port.setCurrentText(self._restore_port)
+        self.cmb_port.blockSignals(False)
         self.statusbar.showMessage(f"Ports: {ports}", 2000)
+        self._connect_device()
 
     def _on_preset(self, name):
         """Handle preset change: update steps_per_mm and save."""
@@ -385,25 +532,50 @@ class MainWindow(QMainWindow):
         """Move relative in background thread."""
         cnt = sign * abs(self._to_counts(self.ed_rel.text(), self.cmb_unit_rel))
         self.statusbar.showMessage("Moving relative...", 2000)
-        self._run_async(self.api.move_rel, cnt)
+        self._submit("move_rel", cnt)
 
     def _move_abs(self):
         """Move absolute in background thread."""
         cnt = self._to_counts(self.ed_abs.text(), self.cmb_unit_abs)
         self.statusbar.showMessage("Moving absolute...", 2000)
-        self._run_async(self.api.move_abs, cnt)
+        self._submit("move_abs", cnt)
+
+    def _jog_start(self, direction):
+        """Hold button pressed: run until released (the backend stops the cube if we go silent)."""
+        if not self.api:
+            return
+        self._jog_release()
+        try:
+            mm_s = float(self.ed_jog.text())
+        except ValueError:
+            mm_s = 0.0
+        self._jog = self.api.jog_session()
+        self._jog.start(direction, round(mm_s * self.steps_per_mm) or None)   # 0 → cube's own speed
+        self.statusbar.showMessage(f"Jogging {direction}...")
+        self._poller.poke()
+
+    def _jog_release(self):
+        """Hold button released (or STOP / backend change / close)."""
+        jog, self._jog = self._jog, None
+        if jog is None:
+            return
+        jog.release()
+        if jog.error:
+            self.statusbar.showMessage(f"Jog failed: {jog.error}", 4000)
+        else:
+            self.statusbar.showMessage("Done", 2000)
 
     def _refresh_status(self):
-        """Poll backend, update labels, and persist if idle & homed."""
+        """Ask the background poller for a fresh status right away (non-blocking)."""
         if not self.api:
             self.lbl_status.setText("Status: no backend")
             self.lbl_homed.setText("Homed: ✗")
             return
-        try:
-            st = self.api.status()
-        except Exception as e:
-            self.lbl_status.setText(f"Status: ⚠ {e}")
-            return
+        self._poller.poke()
+
+    def _apply_status(self, st):
+        """Update labels from a status dict and persist if idle & homed (once connected and checked)."""
+        self._last_status = st
         busy = st["moving_forward"] or st["moving_reverse"]
         homed_flag = st["homed"]
         pos = st["position"]
@@ -411,36 +583,63 @@ class MainWindow(QMainWindow):
         self.lbl_homed.setText(f"Homed: {'✓' if homed_flag else '✗'}")
         mm = pos / self.steps_per_mm
         self.lbl_pos.setText(f"Pos: {pos} cnt | {mm:.3f} mm")
-        if homed_flag and not busy:
-            port = self.cmb_port.currentText().strip()
-            key  = f"{self.api.base}|{port}"
-            self.positions[key] = {
-                "pos": pos,
-                "time": datetime.datetime.now().isoformat(),
-                "steps_per_mm": self.steps_per_mm,
-                "homed": True
-            }
-            save_positions(self.positions)
-
-    def _run_async(self, fn, *args):
-        """Run a backend call in a Worker/QThread to keep UI responsive."""
-        if not callable(fn):
-            return
-        worker = Worker(fn, *args)
-        thread = QThread(self)
-        worker.moveToThread(thread)
-        thread.started.connect(worker.run)
-        worker.finished.connect(lambda res, err: self._on_done(thread, worker, res, err))
-        thread.start()
-
-    def _on_done(self, thread, worker, res, err):
-        """Cleanup after task and report errors or 'Done'."""
-        thread.quit()
-        thread.wait()
-        worker.deleteLater()
-        thread.deleteLater()
+        key = self._save_key
+        if key and homed_flag and not busy:
+            last = self.positions.get(key, {})
+            # only touch storage when something changed ("time" = when we got here)
+            if (last.get("pos"), last.get("steps_per_mm"), last.get("homed")) != (pos, self.steps_per_mm, True):
+                self.positions[key] = {
+                    "pos": pos,
+                    "time": datetime.datetime.now().isoformat(),
+                    "steps_per_mm": self.steps_per_mm,
+                    "homed": True
+                }
+                save_positions(self.positions)
+
+    def _executor(self):
+        """The long-lived command queue for the current backend (created on first use)."""
+        if not self.api:
+            return None
+        ex = self._executors.get(self.api.base)
+        if ex is None:
+            ex = self._executors[self.api.base] = CommandExecutor(self.api.base)
+            ex.finished.connect(self._on_done)
+            ex.depth.connect(self._on_queue_depth)
+        return ex
+
+    def _submit(self, name, *args):
+        """Queue APIClient.<name>(*args) behind earlier commands; never blocks the UI."""
+        ex = self._executor()
+        if ex:
+            ex.submit(name, *args)
+            self._poller.poke()                   # idle back-off → notice the move now
+
+    def _stop(self):
+        """STOP jumps the queue: pending commands are dropped, /stop is sent at once."""
+        self._jog_release()
+        ex = self._executor()
+        if ex:
+            ex.stop()
+            self._poller.poke()
+
+    def _on_queue_depth(self, n):
+        self.lbl_queue.setText(f"Queued: {n}" if n else "")
+
+    def _on_done(self, name, res, err):
+        """Report errors or 'Done' once a queued command has finished."""
+        endpoint = {"list_ports": "/ports", "connect": "/connect"}.get(name)
+        if endpoint and (not self.api or self.sender().base_url != self.api.base):
+            return                                # answer from a backend we already left
         if err:
-            QMessageBox.critical(self, "Error", str(err))
+            QMessageBox.critical(self, "Error", f"{endpoint} failed:\n{err}" if endpoint else str(err))
+            if name == "list_ports":
+                self._on_ports([])
+        elif name == "list_ports":
+            self._on_ports(res)
+        elif name == "connect":
+            port = res.get("port") or self.cmb_port.currentText().strip()
+            if port == self.cmb_port.currentText().strip():   # else the user has picked another port
+                self._on_connected(port)
         else:
             self.statusbar.showMessage("Done", 2000)
             self._refresh_status()
@@ -7,7 +7,15 @@ from main_window import MainWindow
 def main():
     p = argparse.ArgumentParser(description="TDC001 Docker‐UI launcher")
     p.add_argument("--backend", default=os.getenv("BACKEND_URL", "auto"))
+    p.add_argument("--scan", default=None,
+                   help="only search these comma-separated subnets, e.g. 10.1.4.0/24,192.168.7.0/24 "
+                        "(default: own /24 plus TDC_SCAN_CIDRS or the common lab subnets); "
+                        "'beacon' relies on the UDP beacon alone")
     args = p.parse_args()
+    if args.scan == "beacon":
+        cidrs = []                        # no sweep: UDP replies + localhost only
+    else:
+        cidrs = [c.strip() for c in args.scan.split(",") if c.strip()] if args.scan else None
 
     # optional Xvfb+noVNC support for headless Docker
     if os.getenv("USE_NOVNC"):
@@ -16,7 +24,7 @@ def main():
             subprocess.Popen(["websockify", "6080", "localhost:5900"])
 
     app = QApplication(sys.argv)
-    w   = MainWindow(args.backend)
+    w   = MainWindow(args.backend, cidrs)
     w.show()
     sys.exit(app.exec())
 
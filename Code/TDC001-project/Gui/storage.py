@@ -1,59 +1,200 @@
 # -------------------------------
 # File: storage.py
 # -------------------------------
+"""
+Persistent GUI state: settings, last positions and known backends.
+
+State lives in memory; every save only records which *keys* changed.  Changed
+keys are written to a small SQLite database (WAL mode) at most once per
+FLUSH_DELAY seconds, in one transaction, so a save every 500 ms costs nothing
+when the value did not change and never rewrites unrelated keys.  The old
+~/.tdc001_state.json is imported once, the first time the database is empty.
+"""
 from pathlib import Path
+import atexit
+import datetime
 import json
+import sqlite3
+import threading
+
+# where we persist state (settings + positions + known backends)
+DB_PATH = Path.home() / ".tdc001_state.db"
 
-# where we persist state (settings + positions)
+# pre-database JSON file, imported once if present
 STORAGE_PATH = Path.home() / ".tdc001_state.json"
 
+# coalesce writes: flush changed keys at most this often (seconds)
+FLUSH_DELAY = 1.0
+
+# backends not seen for this long are forgotten
+BACKEND_TTL = datetime.timedelta(days=30)
+
+SECTIONS = ("settings", "positions", "backends")
+
+
+class _Store:
+    """In-memory state plus a coalescing, key-level SQLite writer."""
+
+    def __init__(self, path: Path, legacy: Path, delay: float):
+        self.path, self.delay = path, delay
+        self._lock = threading.RLock()
+        self._data = {name: {} for name in SECTIONS}
+        self._dirty = set()                     # (section, key) to upsert/delete
+        self._timer = None
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self._db = sqlite3.connect(str(path), check_same_thread=False, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS state ("
+            " section TEXT NOT NULL, key TEXT NOT NULL, value TEXT NOT NULL,"
+            " PRIMARY KEY (section, key))"
+        )
+        for section, key, value in self._db.execute("SELECT section, key, value FROM state"):
+            self._data.setdefault(section, {})[key] = json.loads(value)
+        if not any(self._data.values()):
+            self._import_json(legacy)
+        atexit.register(self.flush)
+
+    # ─── reads ───────────────────────────────────────────────────────────
+    def section(self, name: str) -> dict:
+        with self._lock:
+            return json.loads(json.dumps(self._data.get(name, {})))   # caller gets a copy
+
+    # ─── writes ──────────────────────────────────────────────────────────
+    def replace(self, name: str, mapping: dict) -> None:
+        """Make section *name* equal *mapping*; only differing keys get written."""
+        with self._lock:
+            current = self._data.setdefault(name, {})
+            for key in set(current) - set(mapping):
+                del current[key]
+                self._dirty.add((name, key))
+            for key, value in mapping.items():
+                if current.get(key, _MISSING) != value:
+                    current[key] = json.loads(json.dumps(value))     # own copy
+                    self._dirty.add((name, key))
+            if self._dirty and self._timer is None:
+                self._timer = threading.Timer(self.delay, self.flush)
+                self._timer.daemon = True
+                self._timer.start()
+
+    def flush(self) -> None:
+        """Write all pending keys in one atomic transaction."""
+        with self._lock:
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+            if not self._dirty:
+                return
+            upserts, deletes = [], []
+            for section, key in self._dirty:
+                if key in self._data.get(section, {}):
+                    upserts.append((section, key, json.dumps(self._data[section][key])))
+                else:
+                    deletes.append((section, key))
+            with self._db:                      # BEGIN … COMMIT (ROLLBACK on error)
+                self._db.execute("BEGIN")
+                self._db.executemany(
+                    "INSERT INTO state (section, key, value) VALUES (?, ?, ?) "
+                    "ON CONFLICT (section, key) DO UPDATE SET value = excluded.value", upserts)
+                self._db.executemany("DELETE FROM state WHERE section = ? AND key = ?", deletes)
+            self._dirty.clear()
+
+    def _import_json(self, legacy: Path) -> None:
+        try:
+            old = json.loads(legacy.read_text())
+        except (FileNotFoundError, ValueError):
+            return
+        for name, mapping in old.items():
+            if isinstance(mapping, dict):
+                self.replace(name, mapping)
+        self.flush()
+
+
+_MISSING = object()
+_store = None
+_store_lock = threading.Lock()
+
+
+def _get_store() -> _Store:
+    """Open the database on first use (so DB_PATH can be changed before that)."""
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = _Store(DB_PATH, STORAGE_PATH, FLUSH_DELAY)
+        return _store
+
+
+def flush() -> None:
+    """
+    Write any pending changes now (also runs automatically at exit).
+    """
+    _get_store().flush()
+
 
 def load_state() -> dict:
     """
-    Load complete state from disk, returning a dict with "settings" and "positions".
+    Return complete state as a dict with "settings", "positions" and "backends".
     """
-    try:
-        return json.loads(STORAGE_PATH.read_text())
-    except FileNotFoundError:
-        return {"settings": {}, "positions": {}}
+    store = _get_store()
+    return {name: store.section(name) for name in SECTIONS}
 
 
 def save_state(state: dict) -> None:
     """
-    Atomically write the full state (settings + positions) back to disk.
+    Replace the full state; only keys that actually changed are written.
     """
-    STORAGE_PATH.parent.mkdir(parents=True, exist_ok=True)
-    STORAGE_PATH.write_text(json.dumps(state, indent=2))
+    store = _get_store()
+    for name, mapping in state.items():
+        store.replace(name, mapping)
 
 
 def load_positions() -> dict:
     """
     Return the positions sub-dict from saved state.
     """
-    return load_state().get("positions", {})
+    return _get_store().section("positions")
 
 
 def save_positions(positions: dict) -> None:
     """
-    Save only the positions into the state file, preserving existing settings.
+    Save only the positions, preserving existing settings.
     """
-    state = load_state()
-    state["positions"] = positions
-    save_state(state)
+    _get_store().replace("positions", positions)
 
 
 def load_settings() -> dict:
     """
     Return the settings sub-dict from saved state.
     """
-    return load_state().get("settings", {})
+    return _get_store().section("settings")
 
 
 def save_settings(settings: dict) -> None:
     """
-    Save only the settings into the state file, preserving existing positions.
+    Save only the settings, preserving existing positions.
     """
-    state = load_state()
-    state["settings"] = settings
-    save_state(state)
+    _get_store().replace("settings", settings)
+
 
+def load_backends() -> dict:
+    """
+    Return the cached backends { url: {"last_seen": iso, "rtt_ms": float} },
+    dropping entries not seen within BACKEND_TTL.
+    """
+    cutoff = datetime.datetime.now() - BACKEND_TTL
+    fresh = {}
+    for url, info in _get_store().section("backends").items():
+        try:
+            if datetime.datetime.fromisoformat(info["last_seen"]) >= cutoff:
+                fresh[url] = info
+        except (KeyError, TypeError, ValueError):
+            pass  # malformed entry → forget it
+    return fresh
+
+
+def save_backends(backends: dict) -> None:
+    """
+    Save only the backend cache, preserving everything else.
+    """
+    _get_store().replace("backends", backends)
@@ -1,6 +1,12 @@
 # === File: tdc_ui/worker.py ===
+import asyncio
+import threading
+from collections import deque
+
 from PyQt6.QtCore import QObject, pyqtSignal
 
+from api import APIClient
+
 class Worker(QObject):
     """Runs any function in a QThread and emits (result, error)."""
     finished = pyqtSignal(object, object)
@@ -17,3 +23,276 @@ class Worker(QObject):
         except Exception as e:
             res, err = None, e
         self.finished.emit(res, err)
+
+
+class StatusStreamWorker(QObject):
+    """Pumps an :class:`api.StatusSubscription` from a QThread.
+
+    Emits ``status`` for every pushed update and ``finished`` with the error
+    (or ``None``) once the stream ends.
+    """
+    status = pyqtSignal(dict)
+    finished = pyqtSignal(object)
+
+    def __init__(self, subscription):
+        super().__init__()
+        self.subscription = subscription
+
+    def run(self):
+        err = None
+        try:
+            for st in self.subscription:
+                self.status.emit(st)
+        except Exception as e:
+            err = e
+        self.finished.emit(err)
+
+    def stop(self):
+        self.subscription.close()
+
+
+class DiscoveryWorker(QObject):
+    """Runs an async backend scan (e.g. :func:`api.discover_backends`) on its
+    own event loop inside a QThread.
+
+    Emits ``found(url, rtt_ms)`` for every backend as soon as it answers and
+    ``finished`` with the error (or ``None``) when the scan is over.
+    """
+    found = pyqtSignal(str, float)
+    finished = pyqtSignal(object)
+
+    def __init__(self, scan):
+        super().__init__()
+        self.scan = scan                     # async iterator of (url, rtt_ms)
+        self._stopped = False
+
+    def run(self):
+        err = None
+        try:
+            asyncio.run(self._pump())
+        except Exception as e:
+            err = e
+        self.finished.emit(err)
+
+    async def _pump(self):
+        async for url, rtt_ms in self.scan:
+            if self._stopped:
+                break
+            self.found.emit(url, rtt_ms)
+
+    def stop(self):
+        self._stopped = True
+
+
+class StatusPoller(QObject):
+    """Long-lived ``GET /status`` loop for a QThread.
+
+    Uses the backend's long-poll (``/status?since=<version>``) when it has
+    one: each request returns as soon as the cube changes, or after
+    *long_poll* seconds with nothing, so updates arrive at push latency
+    without polling.  Older backends get plain polling instead: every *fast*
+    seconds while the stage moves, backing off towards *slowest* while it is
+    idle.  ``status`` is emitted only when the dict changes and ``error``
+    only when the error text changes, so a slow or dead backend never blocks
+    (or floods) the GUI thread.  Polling stops while any pause reason is set
+    (e.g. ``"hidden"``, ``"stream"``).
+    """
+    status = pyqtSignal(dict)
+    error = pyqtSignal(str)
+
+    def __init__(self, fast=0.05, idle=0.25, slowest=2.0, backoff=1.5, long_poll=3.0):
+        super().__init__()
+        self.fast, self.idle, self.slowest, self.backoff = fast, idle, slowest, backoff
+        self.long_poll = long_poll             # seconds per long-poll request (short: quick shutdown)
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._client = None
+        self._since = 0                        # last status version; None → backend can't long-poll
+        self._pauses = set()
+        self._stopped = False
+        self._last = None                      # last dict / error text emitted
+
+    # ─── control (any thread) ───────────────────────────────────────────
+    def set_backend(self, base_url):
+        """Poll *base_url* from now on (``None`` → stop polling).
+
+        Also used to start afresh on the same backend: replies still in
+        flight are dropped and the next status is emitted even if unchanged.
+        """
+        with self._lock:
+            self._client = APIClient(base_url) if base_url else None
+            self._since = 0 if self.long_poll else None
+            self._last = None
+        self.poke()
+
+    def pause(self, reason):
+        with self._lock:
+            self._pauses.add(reason)
+
+    def resume(self, reason):
+        with self._lock:
+            self._pauses.discard(reason)
+        self.poke()
+
+    def poke(self):
+        """Poll right now instead of waiting for the next tick."""
+        self._wake.set()
+
+    def stop(self):
+        self._stopped = True
+        self._wake.set()
+
+    # ─── loop (poller thread) ───────────────────────────────────────────
+    def run(self):
+        delay = self.idle
+        while not self._stopped:
+            with self._lock:
+                client = None if self._pauses else self._client
+            if client is None:
+                self._wake.wait()              # sleep until resumed / new backend
+                self._wake.clear()
+                continue
+            try:
+                if self._since is not None:
+                    st, delay = self._long_poll(client), self.fast   # fast = coalescing gap
+                else:
+                    st = client.status()
+                    with self._lock:
+                        if client is not self._client:
+                            st = None          # backend switched (or reset) while we waited
+            except Exception as e:
+                self._emit(str(e), self.error)
+                delay = self.slowest
+            else:
+                if st is not None:
+                    self._emit(st, self.status)
+                if self._since is None and st is not None:
+                    busy = st.get("moving_forward") or st.get("moving_reverse")
+                    delay = self.fast if busy else min(self.slowest, max(self.idle, delay * self.backoff))
+            self._wake.wait(delay)
+            self._wake.clear()
+
+    def _long_poll(self, client):
+        """One long-poll round; returns the new status or ``None`` if nothing changed."""
+        reply = client.status_since(self._since, self.long_poll)
+        with self._lock:
+            if client is not self._client:
+                return None                    # backend switched while we waited
+        if not reply:
+            return None                        # 304: wait expired
+        if "version" not in reply or "status" not in reply:
+            self._since = None                 # old backend answered plain /status
+            return reply
+        self._since = reply["version"]
+        return reply["status"]
+
+    def _emit(self, value, signal):
+        with self._lock:
+            if value == self._last:
+                return
+            self._last = value
+        signal.emit(value)
+
+
+class _Lane:
+    """One long-lived thread working through a FIFO of callables."""
+
+    def __init__(self, name):
+        self.queue = deque()
+        self.cond = threading.Condition()
+        self._closed = False
+        self._thread = threading.Thread(target=self._loop, name=name, daemon=True)
+        self._thread.start()
+
+    def put(self, job):
+        with self.cond:
+            self.queue.append(job)
+            self.cond.notify()
+
+    def close(self):
+        with self.cond:
+            self._closed = True
+            self.queue.clear()
+            self.cond.notify()
+
+    def _loop(self):
+        while True:
+            with self.cond:
+                self.cond.wait_for(lambda: self.queue or self._closed)
+                if self._closed:
+                    return
+                job = self.queue.popleft()
+            job()
+
+
+class CommandExecutor(QObject):
+    """Ordered command queue for one backend, worked off by one long-lived thread.
+
+    * Commands run strictly in the order they were submitted.
+    * Consecutive queued ``move_rel`` commands are merged into one net move
+      (and dropped if they cancel out), so rapid +/- clicks cost one request.
+    * :meth:`stop` jumps the queue: pending commands are discarded and
+      ``/stop`` goes out on a separate lane, even while a move is running.
+    * If a command fails, the commands queued behind it are discarded too.
+
+    ``finished(name, result, error)`` and ``depth(n)`` are emitted from the
+    worker threads; Qt delivers them to GUI slots on the GUI thread.
+    """
+    finished = pyqtSignal(str, object, object)
+    depth = pyqtSignal(int)
+
+    def __init__(self, base_url):
+        super().__init__()
+        self.base_url = base_url
+        self._api = APIClient(base_url)
+        self._urgent_api = APIClient(base_url)  # own connection: never waits behind a move
+        self._lock = threading.Lock()
+        self._pending = deque()                 # [name, args] not yet started
+        self._lane = _Lane(f"cmd-{base_url}")
+        self._urgent = _Lane(f"stop-{base_url}")
+
+    def submit(self, name, *args):
+        """Queue ``APIClient.<name>(*args)``."""
+        with self._lock:
+            last = self._pending[-1] if self._pending else None
+            if name == "move_rel" and last and last[0] == "move_rel":
+                last[1] = (last[1][0] + args[0],)          # merge into the queued move
+                if last[1][0] == 0:
+                    self._pending.pop()                    # +n then −n → nothing to do
+            else:
+                self._pending.append([name, args])
+                self._lane.put(self._run_next)
+            n = len(self._pending)
+        self.depth.emit(n)
+
+    def stop(self):
+        """Discard everything queued and send /stop right away."""
+        with self._lock:
+            self._pending.clear()
+        self.depth.emit(0)
+        self._urgent.put(lambda: self._call(self._urgent_api, "stop", ()))
+
+    def shutdown(self):
+        self._lane.close()
+        self._urgent.close()
+
+    # ─── worker side ─────────────────────────────────────────────────────
+    def _run_next(self):
+        with self._lock:
+            if not self._pending:
+                return                                     # merged away / cleared by stop
+            name, args = self._pending.popleft()
+            n = len(self._pending)
+        self.depth.emit(n)
+        if not self._call(self._api, name, args):
+            with self._lock:
+                self._pending.clear()                      # don't run moves after a failure
+            self.depth.emit(0)
+
+    def _call(self, api, name, args):
+        try:
+            res, err = getattr(api, name)(*args), None
+        except Exception as e:
+            res, err = None, e
+        self.finished.emit(name, res, err)
+        return err is None